@@ -1,18 +1,346 @@
 import os
+import sys
+import gzip
+import json
+import re
+import time
+import pstats
+import cProfile
+import threading
+import hashlib
+import tempfile
+import inspect
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.compute as pc
+import duckdb
 import fitz
 import nltk
 import folium
+import argparse
+import matplotlib
 import seaborn as sns
 import matplotlib.ticker as mticker
-import matplotlib.pyplot as plt
+
+# Backend sem interface gráfica: os insights rodam em threads e só salvam arquivos
+matplotlib.use("Agg")
+
 import matplotlib.colors as mcolors
 
+from folium.plugins import FastMarkerCluster
+
 from glob import glob
 from nltk.corpus import stopwords
 from collections import Counter
+from contextlib import contextmanager
 from wordcloud import WordCloud
-from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from matplotlib.figure import Figure
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pandas.api.types import union_categoricals
+
+CACHE_DIR_PADRAO = os.path.join(".cache", "parquet")
+# Abaixo deste volume de CSV a converter, a carga é feita no próprio processo: subir o pool custa mais que o parse
+LIMIAR_CARGA_PROCESSOS = 8 * 1024 * 1024
+# Muda quando o formato do cache muda (2: rótulos de exibição nos metadados)
+VERSAO_CACHE = 2
+# Partições dos datasets: pastas no estilo hive (candidatos/ano=2020/uf=SC/) ou, no layout do
+# TSE, o ano e a UF no fim do nome do arquivo (consulta_cand_2020_SC.csv)
+CHAVES_PARTICAO = {"ano": "ANO_ELEICAO", "uf": "SG_UF"}
+PADRAO_PARTICAO_ARQUIVO = re.compile(r"_(\d{4})(?:_([A-Za-z]+))?\.csv$", re.IGNORECASE)
+MANIFESTO_PATH = os.path.join("output", "manifesto.json")
+PATH_PROPOSTAS = './data/candidatos_propostas_governo/'
+MUNICIPIOS_PATH = './data/municipios/municipios.csv'
+CACHE_PROPOSTAS_DIR = os.path.join(".cache", "propostas")
+
+UFS_PARA_REGIOES = {
+    "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
+    "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
+    "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
+    "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
+    "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
+    "PR": "Sul", "RS": "Sul", "SC": "Sul"
+}
+
+# Código IBGE de cada UF, usado quando a tabela de municípios traz apenas codigo_uf
+CODIGOS_IBGE_UF = {
+    11: "RO", 12: "AC", 13: "AM", 14: "RR", 15: "PA", 16: "AP", 17: "TO",
+    21: "MA", 22: "PI", 23: "CE", 24: "RN", 25: "PB", 26: "PE", 27: "AL", 28: "SE", 29: "BA",
+    31: "MG", 32: "ES", 33: "RJ", 35: "SP", 41: "PR", 42: "SC", 43: "RS",
+    50: "MS", 51: "MT", 52: "GO", 53: "DF"
+}
+
+# Desenha cada linha [lat, lon, cor, popup] do mapa como um círculo colorido pelo partido
+CALLBACK_MARCADOR = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 6, color: row[2], fill: true, fillOpacity: 0.7
+    });
+    marker.bindPopup(row[3]);
+    return marker;
+}
+"""
+
+# Colunas lidas de cada dataset e seus tipos. Valores decimais usam vírgula.
+ESQUEMAS = {
+    "candidatos": {
+        "SG_UF": "category",
+        "NM_UE": "category",
+        "DS_CARGO": "category",
+        "SQ_CANDIDATO": "int64",
+        "NM_CANDIDATO": "str",
+        "SG_PARTIDO": "category",
+        "SQ_COLIGACAO": "int64",
+        "NR_TURNO": "Int64",
+        "DS_SIT_TOT_TURNO": "category",
+    },
+    "candidatos_bens": {
+        "SG_UF": "category",
+        "SQ_CANDIDATO": "int64",
+        "VR_BEM_CANDIDATO": "float64",
+    },
+    "candidatos_info_complementar": {
+        "SG_UF": "category",
+        "SQ_CANDIDATO": "int64",
+        "CD_ETNIA_INDIGENA": "Int64",
+        "ST_QUILOMBOLA": "category",
+    },
+    "candidatos_redes_sociais": {
+        "SG_UF": "category",
+        "SQ_CANDIDATO": "int64",
+        "DS_URL": "str",
+    },
+    # O insight 2 publica o arquivo de coligações inteiro, então o esquema traz todas as colunas
+    # do layout do TSE. A exceção é ANO_ELEICAO, que vem da partição, e a execução usa um único ano
+    "coligacoes": {
+        "DT_GERACAO": "str",
+        "HH_GERACAO": "str",
+        "CD_TIPO_ELEICAO": "Int64",
+        "NM_TIPO_ELEICAO": "category",
+        "NR_TURNO": "Int64",
+        "CD_ELEICAO": "Int64",
+        "DS_ELEICAO": "category",
+        "DT_ELEICAO": "category",
+        "TP_ABRANGENCIA": "category",
+        "SG_UF": "category",
+        "SG_UE": "category",
+        "NM_UE": "category",
+        "CD_CARGO": "Int64",
+        "DS_CARGO": "category",
+        "TP_AGREMIACAO": "category",
+        "NR_PARTIDO": "Int64",
+        "SG_PARTIDO": "category",
+        "NM_PARTIDO": "category",
+        "NR_FEDERACAO": "Int64",
+        "NM_FEDERACAO": "category",
+        "SG_FEDERACAO": "category",
+        "DS_COMPOSICAO_FEDERACAO": "str",
+        "SQ_COLIGACAO": "int64",
+        "NM_COLIGACAO": "str",
+        "DS_COMPOSICAO_COLIGACAO": "str",
+    },
+    "motivo_cassacao": {
+        "SG_UF": "category",
+        "SQ_CANDIDATO": "int64",
+        "DS_MOTIVO_CASSACAO": "category",
+    },
+    "vagas": {
+        "SG_UF": "category",
+        "NM_UE": "category",
+        "DS_CARGO": "category",
+        "QT_VAGAS": "int64",
+    },
+}
+
+# Colunas repetitivas guardadas como category e levadas, uma única vez e na leitura, à forma
+# canônica: sem acentos, sem espaços nas pontas e numa única caixa ("Eleito por Média" -> "eleito por media").
+# A forma canônica é só a chave; as saídas mostram a grafia original registrada em ROTULOS
+COLUNAS_CANONICAS = {
+    "SG_UF": "maiusculas",
+    "NM_UE": "maiusculas",
+    "SG_PARTIDO": "maiusculas",
+    "DS_CARGO": "minusculas",
+    "DS_SIT_TOT_TURNO": "minusculas",
+}
+
+# Dicionários compartilhados: as categorias destas colunas partem sempre do mesmo domínio, então
+# o código de cada valor é o mesmo em todos os datasets (valores fora do domínio entram em ordem)
+DOMINIOS = {
+    "SG_UF": sorted(UFS_PARA_REGIOES),
+    "REGIAO": sorted(set(UFS_PARA_REGIOES.values())),
+    "DS_CARGO": ["prefeito", "vereador", "vice-prefeito"],
+    "TIPO_REDE": ["facebook", "instagram", "linkedin", "outros", "twitter", "youtube"],
+}
+
+# Colunas de cada dataset usadas por cada insight
+COLUNAS_INSIGHTS = {
+    1: {
+        "candidatos": ["SQ_CANDIDATO", "NM_CANDIDATO", "DS_CARGO", "DS_SIT_TOT_TURNO"],
+        "candidatos_bens": ["SQ_CANDIDATO", "VR_BEM_CANDIDATO"],
+    },
+    2: {
+        "candidatos": ["SG_UF", "SQ_COLIGACAO", "DS_SIT_TOT_TURNO"],
+        "coligacoes": list(ESQUEMAS["coligacoes"]),
+    },
+    3: {"candidatos": ["SG_UF", "SG_PARTIDO"]},
+    4: {"candidatos": ["SG_UF", "SG_PARTIDO"]},
+    5: {"candidatos": ["SG_UF", "SG_PARTIDO", "DS_CARGO"]},
+    6: {"candidatos_info_complementar": ["SG_UF", "CD_ETNIA_INDIGENA", "ST_QUILOMBOLA"]},
+    7: {"candidatos_redes_sociais": ["SG_UF", "DS_URL"]},
+    8: {},
+    9: {"candidatos": ["SG_UF", "NM_UE", "SG_PARTIDO", "DS_CARGO", "DS_SIT_TOT_TURNO"]},
+    10: {
+        "candidatos": ["ANO_ELEICAO", "SQ_CANDIDATO", "SG_UF", "SG_PARTIDO", "DS_CARGO", "NR_TURNO", "DS_SIT_TOT_TURNO"],
+        "candidatos_bens": ["ANO_ELEICAO", "SQ_CANDIDATO", "VR_BEM_CANDIDATO"],
+        "candidatos_info_complementar": ["ANO_ELEICAO", "SQ_CANDIDATO", "CD_ETNIA_INDIGENA", "ST_QUILOMBOLA"],
+    },
+    11: {
+        "candidatos": ["ANO_ELEICAO"] + list(ESQUEMAS["candidatos"]),
+        "candidatos_bens": ["ANO_ELEICAO", "SQ_CANDIDATO", "VR_BEM_CANDIDATO"],
+        "candidatos_info_complementar": ["ANO_ELEICAO", "SQ_CANDIDATO", "CD_ETNIA_INDIGENA", "ST_QUILOMBOLA"],
+        "candidatos_redes_sociais": ["ANO_ELEICAO", "SQ_CANDIDATO", "DS_URL"],
+        "coligacoes": ["ANO_ELEICAO", "SQ_COLIGACAO"],
+    },
+}
+
+# Colunas calculadas a partir de outra coluna, com a mesma regra nas duas engines:
+# ("mapa", origem, dicionário) ou ("dominio", origem, padrão, valor quando não casa), em que o
+# padrão é procurado no domínio da URL, em minúsculas
+COLUNAS_DERIVADAS = {
+    "REGIAO": ("mapa", "SG_UF", UFS_PARA_REGIOES),
+    "TIPO_REDE": ("dominio", "DS_URL", r'(facebook|instagram|twitter|youtube|linkedin)', 'outros'),
+}
+
+# Agregação de cada etapa dos insights, declarada uma única vez e executada pelo pandas
+# (agregar_pandas) ou pelo DuckDB (agregar_duckdb). Tipos: "selecao" (filtra e projeta
+# colunas), "contagem" (linhas por grupo) e "soma" (soma de "valor" por grupo). Os filtros usam
+# "==", "!=" ou "in", e valores nulos nunca passam. "semi_join" mantém só as linhas cuja chave
+# aparece no resultado da etapa anterior.
+CONSULTAS = {
+    1: [
+        {
+            "tipo": "selecao", "dataset": "candidatos", "colunas": ["SQ_CANDIDATO", "NM_CANDIDATO"],
+            "filtros": [("DS_CARGO", "==", "prefeito"), ("DS_SIT_TOT_TURNO", "==", "eleito")],
+        },
+        {
+            "tipo": "soma", "dataset": "candidatos_bens", "grupos": ["SQ_CANDIDATO"],
+            "valor": "VR_BEM_CANDIDATO", "semi_join": "SQ_CANDIDATO",
+        },
+    ],
+    2: [
+        {
+            "tipo": "contagem", "dataset": "candidatos", "grupos": ["SQ_COLIGACAO", "SG_UF"],
+            "filtros": [("DS_SIT_TOT_TURNO", "==", "eleito")],
+        },
+        {"tipo": "selecao", "dataset": "coligacoes", "colunas": list(ESQUEMAS["coligacoes"])},
+    ],
+    3: [{"tipo": "contagem", "dataset": "candidatos", "grupos": ["SG_UF", "SG_PARTIDO"]}],
+    4: [{"tipo": "contagem", "dataset": "candidatos", "grupos": ["REGIAO", "SG_PARTIDO"]}],
+    5: [
+        {
+            "tipo": "contagem", "dataset": "candidatos", "grupos": ["SG_UF", "SG_PARTIDO"],
+            "filtros": [("DS_CARGO", "in", ["prefeito", "vice-prefeito", "vereador"])],
+        },
+    ],
+    6: [
+        {
+            "tipo": "contagem", "dataset": "candidatos_info_complementar", "grupos": ["REGIAO"],
+            "filtros": [("CD_ETNIA_INDIGENA", "!=", 0)],
+        },
+        {
+            "tipo": "contagem", "dataset": "candidatos_info_complementar", "grupos": ["REGIAO"],
+            "filtros": [("ST_QUILOMBOLA", "==", "S")],
+        },
+    ],
+    7: [{"tipo": "contagem", "dataset": "candidatos_redes_sociais", "grupos": ["SG_UF", "TIPO_REDE"]}],
+}
+
+# Tipos do DuckDB equivalentes aos dtypes de ESQUEMAS
+TIPOS_DUCKDB = {"category": "VARCHAR", "str": "VARCHAR", "int64": "BIGINT", "Int64": "BIGINT", "float64": "DOUBLE"}
+
+# Dimensões do cubo pré-agregado consultado pelo dashboard
+DIMENSOES_CUBO = ["ANO_ELEICAO", "SG_UF", "REGIAO", "DS_CARGO", "SG_PARTIDO", "DS_SIT_TOT_TURNO", "ETNIA_INDIGENA", "ST_QUILOMBOLA"]
+CUBO_PATH = os.path.join("output", "cubo_candidatos.parquet")
+
+# Tabela fato de candidaturas, ordenada por SQ_CANDIDATO. Cada row group guarda o mínimo e o
+# máximo da chave, e o leitor do Parquet usa essas estatísticas como índice
+FATO_PATH = os.path.join("output", "fato_candidatos.parquet")
+LINHAS_GRUPO_FATO = 64 * 1024
+
+# Gráficos desenhados a partir das tabelas agregadas dos insights. Cada gráfico tem um ou mais
+# painéis ("barras", "dispersao" ou "nuvem"), e cada painel recebe a sua tabela. O mesmo
+# painel gera o PNG (seaborn) e, opcionalmente, a especificação Vega-Lite usada pelo dashboard.
+# O tipo "mapa" gera o HTML do folium.
+GRAFICOS = {
+    "total_bens_prefeitos_eleitos": {
+        "tamanho": (12, 8), "ajustar": True,
+        "paineis": [{
+            "tipo": "barras", "x": "NM_CANDIDATO", "y": "VR_BEM_CANDIDATO", "cor_fixa": "blue", "rotacao_x": 45,
+            "titulo": "Top 10 Prefeitos Eleitos com Maior Total de Bens Declarados",
+            "rotulo_x": "Nome do Candidato", "rotulo_y": "Total de Bens Declarados (R$)",
+        }],
+    },
+    "coligacoes_eleitos": {
+        "tamanho": (14, 8),
+        "paineis": [{
+            "tipo": "dispersao", "x": "NUMERO_PARTIDOS", "y": "NUM_ELEITOS", "tamanho": "NUM_ELEITOS",
+            "cor": "SG_UF_x", "x_inteiro": True,
+            "titulo": "Coligações: Número de Eleitos por Número de Partidos e UF",
+            "rotulo_x": "Número de Partidos na Coligação", "rotulo_y": "Número de Eleitos",
+        }],
+    },
+    "partido_maior_por_uf": {
+        "tamanho": (10, 8),
+        "paineis": [{
+            "tipo": "barras", "x": "NUM_CANDIDATOS", "y": "SG_UF", "cor": "SG_PARTIDO", "dodge": False,
+            "titulo": "Partido com Maior Quantidade de Candidatos por UF",
+            "rotulo_x": "Número de Candidatos", "rotulo_y": "UF", "legenda": "Partido",
+        }],
+    },
+    "distribuicao_partido_regiao": {
+        "tamanho": (12, 6),
+        "paineis": [{
+            "tipo": "barras", "x": "REGIAO", "y": "NUM_CANDIDATOS", "cor": "SG_PARTIDO",
+            "titulo": "Distribuição de Candidaturas por Partido e Região",
+            "rotulo_x": "Região", "rotulo_y": "Número de Candidatos", "legenda": "Partido", "legenda_fora": True,
+        }],
+    },
+    "partido_dominante_por_uf": {
+        "tamanho": (10, 8),
+        "paineis": [{
+            "tipo": "barras", "x": "TOTAL_CANDIDATOS", "y": "SG_UF", "cor": "SG_PARTIDO", "dodge": False,
+            "titulo": "Partido Dominante por UF (Prefeito, Vice e Vereadores)",
+            "rotulo_x": "Total de Candidatos", "rotulo_y": "UF", "legenda": "Partido",
+        }],
+    },
+    "indigenas_quilombolas_regiao": {
+        "tamanho": (14, 6), "ajustar": True,
+        "paineis": [
+            {"tipo": "barras", "x": "REGIAO", "y": "NUM_INDIGENAS", "paleta": "Blues",
+             "titulo": "Número de Candidatos Indígenas por Região"},
+            {"tipo": "barras", "x": "REGIAO", "y": "NUM_QUILOMBOLAS", "paleta": "Greens",
+             "titulo": "Número de Candidatos Quilombolas por Região"},
+        ],
+    },
+    "rede_social_uf": {
+        "tamanho": (12, 6),
+        "paineis": [{
+            "tipo": "barras", "x": "SG_UF", "y": "NUM_CANDIDATOS", "cor": "TIPO_REDE", "ordenar_x": True,
+            "titulo": "Rede Social Preferida dos Candidatos por UF",
+            "rotulo_x": "UF", "rotulo_y": "Número de Candidatos", "legenda": "Rede Social", "legenda_fora": True,
+        }],
+    },
+    "nuvem_termos_propostas": {
+        "tamanho": (10, 5),
+        "paineis": [{
+            "tipo": "nuvem", "x": "Termo", "y": "Frequência", "titulo": "Principais Termos nas Propostas de Governo",
+        }],
+    },
+    "resultado_eleicoes_mapa": {"tipo": "mapa"},
+}
+GRAFICOS_SPECS_DIR = os.path.join("output", "graficos")
 
 def ensure_output_directory():
     if not os.path.exists("output"):
@@ -28,6 +356,372 @@ def ensure_stopwords():
 
 stop_words = ensure_stopwords()
 
+
+# Instrumentação: tempo de parede, CPU, pico de memória e linhas de cada etapa do pipeline
+
+def rss_atual_mb():
+    # Memória residente do processo; só disponível onde existe /proc (Linux)
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def com_cpu(funcao, *args, **kwargs):
+    # Executado nos workers do pool de carga: devolve o resultado e a CPU gasta no worker, que a
+    # etapa que enviou a tarefa soma com Metricas.somar_cpu_workers. O pool vive a execução
+    # inteira, então a CPU dos filhos encerrados (getrusage) não serviria
+    cpu = time.process_time()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.process_time() - cpu
+
+class Metricas:
+    # Cada etapa vira um evento. Uma thread em segundo plano amostra o RSS e guarda o pico
+    # das etapas abertas; com etapas simultâneas, o pico é o do processo no período.
+
+    def __init__(self, intervalo=0.01):
+        self.intervalo = intervalo
+        self.eventos = []
+        self.abertas = {}
+        self.perfis = None
+        self.amostrador = None
+        self.trava = threading.Lock()
+        self.local = threading.local()
+        self.inicio = time.perf_counter()
+        self.inicio_epoca = time.time()
+
+    def iniciar(self, perfilar=False):
+        self.perfis = [] if perfilar else None
+        if self.amostrador is None and rss_atual_mb() is not None:
+            self.amostrador = threading.Thread(target=self.amostrar, daemon=True)
+            self.amostrador.start()
+
+    def amostrar(self):
+        while True:
+            rss = rss_atual_mb()
+            with self.trava:
+                for chave, pico in self.abertas.items():
+                    self.abertas[chave] = max(pico, rss)
+            time.sleep(self.intervalo)
+
+    @contextmanager
+    def etapa(self, nome, categoria, **args):
+        pilha = self.local.__dict__.setdefault("pilha", [])
+        evento = {
+            "nome": nome, "categoria": categoria, "insight": getattr(self.local, "insight", None),
+            "filhos_s": 0.0, "workers_s": 0.0, **args
+        }
+        with self.trava:
+            self.abertas[id(evento)] = rss_atual_mb()
+        # O cProfile só pode ser ligado uma vez por thread: perfila apenas as etapas de topo
+        perfil = cProfile.Profile() if self.perfis is not None and not pilha else None
+        pilha.append(evento)
+        inicio, cpu = time.perf_counter(), time.thread_time()
+        if perfil:
+            perfil.enable()
+        try:
+            yield evento
+        finally:
+            if perfil:
+                perfil.disable()
+            duracao = time.perf_counter() - inicio
+            evento.update(
+                inicio_s=inicio - self.inicio,
+                duracao_s=duracao,
+                proprio_s=duracao - evento.pop("filhos_s"),
+                cpu_s=time.thread_time() - cpu,
+                cpu_workers_s=evento.pop("workers_s"),
+                thread=threading.get_ident(),
+            )
+            pilha.pop()
+            if pilha:
+                pilha[-1]["filhos_s"] += duracao
+            with self.trava:
+                pico = self.abertas.pop(id(evento))
+                evento["pico_rss_mb"] = None if pico is None else max(pico, rss_atual_mb())
+                self.eventos.append(evento)
+                if perfil:
+                    self.perfis.append(perfil)
+
+    def somar_cpu_workers(self, segundos):
+        # CPU medida nos workers (com_cpu), somada às etapas abertas nesta thread
+        for evento in self.local.__dict__.get("pilha", []):
+            evento["workers_s"] += segundos
+
+    def registrar(self, nome, categoria, insight, inicio, duracao_s, cpu_s, pico_rss_mb, pid):
+        # Evento medido fora desta thread (no pool de renderização)
+        with self.trava:
+            self.eventos.append({
+                "nome": nome, "categoria": categoria, "insight": insight, "inicio_s": inicio - self.inicio_epoca,
+                "duracao_s": duracao_s, "proprio_s": duracao_s, "cpu_s": cpu_s, "cpu_workers_s": 0.0,
+                "thread": pid, "pico_rss_mb": pico_rss_mb,
+            })
+
+    def salvar_trace(self, caminho):
+        # Formato trace-event do Chrome, aberto em chrome://tracing ou no Perfetto
+        eventos = [
+            {
+                "name": evento["nome"], "cat": evento["categoria"], "ph": "X", "pid": os.getpid(),
+                "tid": evento["thread"], "ts": round(evento["inicio_s"] * 1e6), "dur": round(evento["duracao_s"] * 1e6),
+                "args": {chave: valor for chave, valor in evento.items() if chave not in ("nome", "categoria", "thread")},
+            }
+            for evento in self.eventos
+        ]
+        with open(caminho, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, file, ensure_ascii=False, default=str)
+
+    def salvar_perfil(self, caminho):
+        if not self.perfis:
+            return
+        estatisticas = pstats.Stats(self.perfis[0])
+        for perfil in self.perfis[1:]:
+            estatisticas.add(perfil)
+        estatisticas.dump_stats(caminho)
+
+    def resumo(self):
+        if not self.eventos:
+            return
+        print(f"\n{'Etapa':<58} {'Tempo(s)':>9} {'Próprio':>8} {'CPU':>7} {'Workers':>8} {'RSS(MB)':>8} {'Linhas':>9}")
+        for evento in sorted(self.eventos, key=lambda evento: evento["inicio_s"]):
+            pico = evento["pico_rss_mb"]
+            linhas = evento.get("linhas")
+            print(
+                f"{evento['nome'][:58]:<58} {evento['duracao_s']:>9.3f} {evento['proprio_s']:>8.3f} "
+                f"{evento['cpu_s']:>7.2f} {evento['cpu_workers_s']:>8.2f} "
+                f"{'-' if pico is None else f'{pico:.0f}':>8} {'-' if linhas is None else linhas:>9}"
+            )
+
+METRICAS = Metricas()
+etapa = METRICAS.etapa
+
+@contextmanager
+def escrita_atomica(caminho):
+    # Grava num temporário da mesma pasta e renomeia: quem lê a saída (o dashboard) vê o
+    # arquivo antigo ou o novo, nunca um arquivo pela metade
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield temporario
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+def salvar_csv(df, caminho):
+    with etapa(f"escrita {caminho}", "escrita", linhas=len(df)), escrita_atomica(caminho) as temporario:
+        exibir(df).to_csv(temporario, index=False)
+
+
+# Renderização: os insights entregam tabelas já agregadas e os gráficos são desenhados num
+# pool de processos próprio, em paralelo com o cálculo dos insights seguintes
+
+def caminho_grafico(nome):
+    return os.path.join("output", nome + (".html" if GRAFICOS[nome].get("tipo") == "mapa" else ".png"))
+
+def caminho_spec(nome):
+    return os.path.join(GRAFICOS_SPECS_DIR, nome + ".vl.json")
+
+def desenhar_painel(ax, painel, tabela):
+    x, y = painel["x"], painel["y"]
+    if painel["tipo"] == "nuvem":
+        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(tabela[x].astype(str)))
+        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.axis('off')
+    elif painel["tipo"] == "dispersao":
+        sns.scatterplot(
+            data=tabela, x=x, y=y, size=painel["tamanho"], hue=painel["cor"],
+            sizes=(40, 400), alpha=0.7, legend='full', ax=ax
+        )
+    else:
+        # Uma linha por barra: sem intervalo de confiança, que o seaborn calcularia por bootstrap
+        paleta_por_x = "paleta" in painel and "cor" not in painel
+        sns.barplot(
+            data=tabela, x=x, y=y, hue=x if paleta_por_x else painel.get("cor"),
+            color=painel.get("cor_fixa"), palette=painel.get("paleta"), dodge=False if paleta_por_x else painel.get("dodge", "auto"),
+            order=sorted(tabela[x].unique()) if painel.get("ordenar_x") else None,
+            legend=False if paleta_por_x else "auto", errorbar=None, ax=ax
+        )
+
+    ax.set_title(painel["titulo"])
+    if "rotulo_x" in painel:
+        ax.set_xlabel(painel["rotulo_x"])
+    if "rotulo_y" in painel:
+        ax.set_ylabel(painel["rotulo_y"])
+    if "rotacao_x" in painel:
+        ax.tick_params(axis='x', rotation=painel["rotacao_x"])
+    if painel.get("x_inteiro"):
+        ax.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+    if painel.get("legenda_fora"):
+        ax.legend(title=painel["legenda"], bbox_to_anchor=(1.05, 1), loc='upper left')
+    elif "legenda" in painel:
+        ax.legend(title=painel["legenda"])
+
+def spec_vega(grafico, tabelas):
+    # Especificação Vega-Lite com os dados embutidos, desenhada no navegador pelo dashboard
+    especificacoes = []
+    for painel, tabela in zip(grafico["paineis"], tabelas):
+        x, y = painel["x"], painel["y"]
+        if painel["tipo"] == "nuvem":
+            # A nuvem de palavras vira um gráfico de barras com a frequência de cada termo
+            x, y = y, x
+        campos = [campo for campo in (x, y, painel.get("cor"), painel.get("tamanho")) if campo]
+        campos = list(dict.fromkeys(campos))
+
+        def codificacao(campo, titulo=None):
+            numerico = pd.api.types.is_numeric_dtype(tabela[campo])
+            return {"field": campo, "type": "quantitative" if numerico else "nominal", "title": titulo or campo}
+
+        codificacoes = {
+            "x": codificacao(x, painel.get("rotulo_x")),
+            "y": codificacao(y, painel.get("rotulo_y")),
+            "tooltip": [codificacao(campo) for campo in campos],
+        }
+        if painel["tipo"] == "nuvem":
+            codificacoes["y"]["sort"] = "-x"
+        if painel.get("cor"):
+            codificacoes["color"] = {"field": painel["cor"], "type": "nominal", "title": painel.get("legenda", painel["cor"])}
+        if painel.get("tamanho"):
+            codificacoes["size"] = {"field": painel["tamanho"], "type": "quantitative"}
+        especificacoes.append({
+            "title": painel["titulo"],
+            "data": {"values": json.loads(tabela[campos].to_json(orient="records", force_ascii=False))},
+            "mark": "point" if painel["tipo"] == "dispersao" else "bar",
+            "encoding": codificacoes,
+        })
+    spec = especificacoes[0] if len(especificacoes) == 1 else {"hconcat": especificacoes}
+    return {"$schema": "https://vega.github.io/schema/vega-lite/v5.json", **spec}
+
+def desenhar_mapa(resultados_municipios, caminho):
+    mapa_brasil = folium.Map(location=[-15.7801, -47.9292], zoom_start=4, prefer_canvas=True)
+
+    partidos_unicos = resultados_municipios['PARTIDO_VENCEDOR'].unique()
+    num_partidos = len(partidos_unicos)
+
+    colormap = matplotlib.colormaps['Set1'].resampled(num_partidos)
+    cores_partidos = {partido: mcolors.to_hex(colormap(i / num_partidos)) for i, partido in enumerate(partidos_unicos)}
+
+    # Todos os marcadores vão num único array JSON, desenhado no navegador pelo callback
+    marcadores = pd.DataFrame({
+        'LATITUDE': resultados_municipios['LATITUDE'].round(4),
+        'LONGITUDE': resultados_municipios['LONGITUDE'].round(4),
+        'COR': resultados_municipios['PARTIDO_VENCEDOR'].map(cores_partidos).fillna('gray'),
+        'POPUP': resultados_municipios['MUNICIPIO'].astype(str) + " - " + resultados_municipios['PARTIDO_VENCEDOR'],
+    })
+    FastMarkerCluster(
+        data=marcadores.values.tolist(),
+        callback=CALLBACK_MARCADOR,
+        options={"disableClusteringAtZoom": 8, "chunkedLoading": True},
+    ).add_to(mapa_brasil)
+
+    with escrita_atomica(caminho) as temporario:
+        mapa_brasil.save(temporario)
+    print(f"Mapa gerado e salvo como '{caminho}'")
+
+def desenhar(nome, tabelas, specs=False):
+    # Executado no pool de renderização; devolve as métricas medidas no worker
+    inicio, cpu, rss_inicial = time.time(), time.process_time(), rss_atual_mb()
+    grafico = GRAFICOS[nome]
+    if grafico.get("tipo") == "mapa":
+        desenhar_mapa(tabelas[0], caminho_grafico(nome))
+    else:
+        fig = Figure(figsize=grafico["tamanho"])
+        eixos = fig.subplots(1, len(grafico["paineis"]))
+        eixos = eixos if len(grafico["paineis"]) > 1 else [eixos]
+        for ax, painel, tabela in zip(eixos, grafico["paineis"], tabelas):
+            desenhar_painel(ax, painel, tabela)
+        if grafico.get("ajustar"):
+            fig.tight_layout()
+        with escrita_atomica(caminho_grafico(nome)) as temporario:
+            fig.savefig(temporario, format="png")
+        if specs:
+            os.makedirs(GRAFICOS_SPECS_DIR, exist_ok=True)
+            with escrita_atomica(caminho_spec(nome)) as temporario, open(temporario, "w", encoding="utf-8") as file:
+                json.dump(spec_vega(grafico, tabelas), file, ensure_ascii=False)
+        elif os.path.exists(caminho_spec(nome)):
+            # A especificação de uma execução anterior com --specs-vega descreveria dados antigos
+            os.remove(caminho_spec(nome))
+    rss_final = rss_atual_mb()
+    return {
+        "inicio": inicio, "duracao_s": time.time() - inicio, "cpu_s": time.process_time() - cpu,
+        "pico_rss_mb": None if rss_final is None else max(rss_inicial, rss_final), "pid": os.getpid(),
+    }
+
+class Renderizador:
+    # Sem iniciar(), desenha na própria thread do insight (uso como biblioteca e benchmarks)
+
+    def __init__(self):
+        self.ativo = True
+        self.specs = False
+        self.executor = None
+        self.pendentes = []
+        self.trava = threading.Lock()
+
+    def iniciar(self, ativo=True, specs=False, jobs=None):
+        self.ativo, self.specs = ativo, specs
+        if ativo and jobs != 0:
+            jobs = jobs or os.cpu_count()
+            self.executor = ProcessPoolExecutor(max_workers=jobs)
+            # Cria os workers agora, com o processo ainda pequeno e antes das threads de carga
+            wait([self.executor.submit(os.getpid) for _ in range(jobs)])
+
+    def __call__(self, nome, *tabelas):
+        if not self.ativo:
+            return
+        tabelas = tuple(exibir(tabela) for tabela in tabelas)
+        insight = getattr(METRICAS.local, "insight", None)
+        if self.executor is None:
+            METRICAS.registrar(f"grafico {caminho_grafico(nome)}", "grafico", insight, **desenhar(nome, tabelas, self.specs))
+            return
+        futuro = self.executor.submit(desenhar, nome, tabelas, self.specs)
+        with self.trava:
+            self.pendentes.append((nome, insight, futuro))
+
+    def concluir(self):
+        # Espera os gráficos pendentes; um gráfico com erro não interrompe os demais
+        for nome, insight, futuro in self.pendentes:
+            try:
+                METRICAS.registrar(f"grafico {caminho_grafico(nome)}", "grafico", insight, **futuro.result())
+            except Exception as e:
+                print(f"Erro no gráfico '{nome}': {e}")
+        self.pendentes = []
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+renderizar = Renderizador()
+
+class PoolCarga:
+    # Um único pool de processos para as cargas de todos os datasets e para a extração dos PDFs
+    # do insight 8, que rodam ao mesmo tempo em threads: o total de processos fica em --jobs-carga,
+    # e não em --jobs-carga por dataset. Sem iniciar() (uso como biblioteca e benchmarks), cada
+    # chamada abre um pool próprio
+
+    def __init__(self):
+        self.executor = None
+        self.jobs = None
+
+    def iniciar(self, jobs=None):
+        self.jobs = jobs or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        # Como no pool de renderização, os workers são criados agora, na thread principal,
+        # e não por fork de uma thread de carga
+        wait([self.executor.submit(os.getpid) for _ in range(self.jobs)])
+
+    @contextmanager
+    def executor_para(self, workers=None):
+        if self.executor is not None:
+            yield self.executor
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield executor
+
+    def concluir(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            self.jobs = None
+
+pool_carga = PoolCarga()
+
 def extract_text_from_pdf(file_path):
     try:
         text = ""
@@ -39,343 +733,1015 @@ def extract_text_from_pdf(file_path):
         print(f"Erro ao extrair texto do PDF '{file_path}': {e}")
         return ""
 
-def process_pdf_file(file_name, path_propostas):
-    if file_name.endswith(".pdf"):
-        return extract_text_from_pdf(os.path.join(path_propostas, file_name))
-    return ""
+def sha256_arquivo(file):
+    sha256 = hashlib.sha256()
+    with open(file, "rb") as conteudo:
+        for bloco in iter(lambda: conteudo.read(1 << 20), b""):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+def texto_proposta(file_path, cache_dir=CACHE_PROPOSTAS_DIR):
+    # O texto extraído fica em cache pelo hash do PDF, então só PDFs novos ou alterados são reprocessados
+    arquivo_cache = os.path.join(cache_dir, sha256_arquivo(file_path) + ".txt.gz")
+    if os.path.exists(arquivo_cache):
+        with gzip.open(arquivo_cache, "rt", encoding="utf-8") as file:
+            return file.read()
+    text = extract_text_from_pdf(file_path)
+    if text:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporario = f"{arquivo_cache}.{os.getpid()}.tmp"
+        with gzip.open(temporario, "wt", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporario, arquivo_cache)
+    return text
+
+def tokenizar(text, stop_words):
+    return [word for word in text.lower().split() if word.isalpha() and word not in stop_words]
+
+def contar_termos_lote(arquivos, stop_words, cache_dir=CACHE_PROPOSTAS_DIR):
+    # Executado nos workers: extrai, tokeniza e devolve só a contagem de termos do lote
+    contagem = Counter()
+    for file_path in arquivos:
+        contagem.update(tokenizar(texto_proposta(file_path, cache_dir), stop_words))
+    return contagem
+
+def mesclar_contadores(contadores):
+    # Mescla em árvore, par a par
+    contadores = list(contadores)
+    if not contadores:
+        return Counter()
+    while len(contadores) > 1:
+        mesclados = []
+        for i in range(0, len(contadores) - 1, 2):
+            contadores[i].update(contadores[i + 1])
+            mesclados.append(contadores[i])
+        if len(contadores) % 2:
+            mesclados.append(contadores[-1])
+        contadores = mesclados
+    return contadores[0]
+
+def listar_propostas(ufs=None, path_propostas=PATH_PROPOSTAS):
+    if ufs is None:
+        ufs = sorted(
+            uf for uf in os.listdir(path_propostas) if os.path.isdir(os.path.join(path_propostas, uf))
+        )
+    return sorted(file for uf in ufs for file in glob(os.path.join(path_propostas, uf, "*.pdf")))
+
+def colunas_necessarias(dataset, insights):
+    colunas = set()
+    for insight in insights:
+        colunas.update(COLUNAS_INSIGHTS[insight].get(dataset, []))
+    # Mantém a ordem declarada no esquema; ANO_ELEICAO vem da partição de cada arquivo
+    # (inserir_ano), e não do esquema, e fica na frente como no df carregado
+    ano = ["ANO_ELEICAO"] if "ANO_ELEICAO" in colunas else []
+    return ano + [coluna for coluna in ESQUEMAS[dataset] if coluna in colunas]
+
+def origem_arquivo(file, dataset=None):
+    stat = os.stat(file)
+    origem = f"{os.path.abspath(file)}|{stat.st_size}|{stat.st_mtime_ns}"
+    if dataset is not None:
+        # Mudanças no esquema também invalidam o cache
+        origem += f"|{dataset}|{sorted(ESQUEMAS[dataset].items())}|{sorted(COLUNAS_CANONICAS.items())}|{VERSAO_CACHE}"
+    return origem
+
+def caminho_cache(file, cache_dir):
+    nome = hashlib.sha1(os.path.abspath(file).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, nome + ".parquet")
+
+def cache_valido(arquivo_cache, origem):
+    # O cache só é válido se caminho, tamanho e mtime do CSV de origem não mudaram
+    if not os.path.exists(arquivo_cache):
+        return False
+    metadados = pq.read_schema(arquivo_cache).metadata or {}
+    return metadados.get(b"origem") == origem.encode("utf-8")
+
+def tabela_cache(arquivo_cache, origem, columns=None):
+    try:
+        if cache_valido(arquivo_cache, origem):
+            tabela = pq.read_table(arquivo_cache, columns=columns)
+            registrar_rotulos_esquema(tabela.schema)
+            return tabela
+    except Exception as e:
+        print(f"Erro ao ler o cache '{arquivo_cache}': {e}")
+    return None
+
+def ler_cache(arquivo_cache, origem, columns=None):
+    tabela = tabela_cache(arquivo_cache, origem, columns)
+    return None if tabela is None else tabela.to_pandas()
 
-def load_file(file):
+def salvar_cache(df, arquivo_cache, origem):
     try:
-        return pd.read_csv(file, sep=';', encoding='latin1')
+        os.makedirs(os.path.dirname(arquivo_cache), exist_ok=True)
+        tabela = com_rotulos(pa.Table.from_pandas(df, preserve_index=False), df)
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[b"origem"] = origem.encode("utf-8")
+        tabela = tabela.replace_schema_metadata(metadados)
+        # Escreve em arquivo temporário e renomeia para não deixar cache corrompido
+        temporario = f"{arquivo_cache}.{os.getpid()}.tmp"
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, arquivo_cache)
+    except Exception as e:
+        print(f"Erro ao salvar o cache '{arquivo_cache}': {e}")
+
+def por_categoria(serie, transformar, dominio=None):
+    # Aplica a transformação uma vez por valor distinto e replica o resultado pelos códigos
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype("category")
+    valores = transformar(serie.cat.categories.to_series(index=range(len(serie.cat.categories))))
+    categorias = sorted(set(valores.dropna()).union(dominio or []))
+    novas = pd.Categorical(valores, categories=categorias)
+    # O código -1 (valor ausente) aponta para o -1 acrescentado no fim
+    codigos = np.append(novas.codes, -1).take(serie.cat.codes.to_numpy())
+    return pd.Series(pd.Categorical.from_codes(codigos, dtype=novas.dtype), index=serie.index, name=serie.name)
+
+def grafia(valores):
+    # Grafia de exibição: a original, só sem espaços nas pontas e com os acentos compostos (NFC)
+    return valores.astype(str).str.normalize("NFC").str.strip()
+
+def forma_canonica(valores, caixa):
+    # Decomposição NFD sem as marcas combinantes: tira os acentos, mas mantém símbolos como "º"
+    valores = grafia(valores).str.normalize("NFD").str.replace("[\u0300-\u036f]", "", regex=True)
+    return valores.str.upper() if caixa == "maiusculas" else valores.str.lower()
+
+
+# Rótulos de exibição: {coluna: {chave canônica: grafia}}. Entre as grafias de uma mesma chave
+# vale a com mais letras acentuadas ("UNIÃO" e não "UNIAO") e, no empate, a maior; a escolha não
+# depende da ordem de carga. Os rótulos acompanham as tabelas nos metadados do cache Parquet e
+# dos arquivos Arrow dos workers
+ROTULOS = {}
+TRAVA_ROTULOS = threading.Lock()
+
+def preferencia_rotulo(rotulo):
+    return (sum(ord(letra) > 127 for letra in rotulo), rotulo)
+
+def registrar_rotulos(coluna, pares):
+    with TRAVA_ROTULOS:
+        registrados = ROTULOS.setdefault(coluna, {})
+        for chave, rotulo in pares:
+            if chave not in registrados or preferencia_rotulo(rotulo) > preferencia_rotulo(registrados[chave]):
+                registrados[chave] = rotulo
+
+def rotulos_df(df):
+    # Rótulos das categorias presentes no df
+    with TRAVA_ROTULOS:
+        return {
+            coluna: {
+                chave: ROTULOS[coluna][chave]
+                for chave in df[coluna].cat.categories if chave in ROTULOS.get(coluna, {})
+            }
+            for coluna in df.columns.intersection(list(COLUNAS_CANONICAS))
+            if isinstance(df[coluna].dtype, pd.CategoricalDtype)
+        }
+
+def com_rotulos(tabela, df):
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[b"rotulos"] = json.dumps(rotulos_df(df), ensure_ascii=False).encode("utf-8")
+    return tabela.replace_schema_metadata(metadados)
+
+def registrar_rotulos_esquema(esquema):
+    rotulos = (esquema.metadata or {}).get(b"rotulos")
+    for coluna, pares in json.loads(rotulos or "{}").items():
+        registrar_rotulos(coluna, pares.items())
+
+def rotular(serie, coluna):
+    # Chave canônica -> grafia de exibição; chaves sem rótulo registrado ficam como estão
+    with TRAVA_ROTULOS:
+        rotulos = dict(ROTULOS.get(coluna, {}))
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.rename_categories(lambda chave: rotulos.get(chave, chave))
+    return serie.map(lambda valor: rotulos.get(valor, valor))
+
+def exibir(df):
+    # Aplicado nas saídas (CSVs, gráficos, cubo e tabela fato)
+    colunas = df.columns.intersection(list(COLUNAS_CANONICAS))
+    if colunas.empty:
+        return df
+    return df.assign(**{coluna: rotular(df[coluna], coluna) for coluna in colunas})
+
+def canonizar(serie, coluna):
+    # A chave canônica vira a categoria e a grafia de cada valor distinto é registrada como rótulo
+    caixa = COLUNAS_CANONICAS[coluna]
+
+    def transformar(valores):
+        grafias = grafia(valores)
+        chaves = forma_canonica(grafias, caixa)
+        registrar_rotulos(coluna, zip(chaves, grafias))
+        return chaves
+
+    return por_categoria(serie, transformar, DOMINIOS.get(coluna))
+
+def normalizar_colunas(df):
+    for coluna in df.columns.intersection(list(COLUNAS_CANONICAS)):
+        df[coluna] = canonizar(df[coluna], coluna)
+    return df
+
+def read_csv_esquema(file, dataset, columns, chunksize=None):
+    esquema = ESQUEMAS[dataset]
+    leitura = pd.read_csv(
+        file, sep=';', encoding='latin1', decimal=',',
+        usecols=lambda coluna: coluna in columns,
+        dtype={coluna: esquema[coluna] for coluna in columns},
+        chunksize=chunksize
+    )
+    if chunksize is None:
+        return normalizar_colunas(leitura)
+    return (normalizar_colunas(bloco) for bloco in leitura)
+
+def load_file(file, cache_dir=None, invalidate_cache=False, dataset=None, columns=None):
+    if dataset is not None and columns is None:
+        columns = list(ESQUEMAS[dataset])
+    if cache_dir is not None:
+        origem = origem_arquivo(file, dataset)
+        arquivo_cache = caminho_cache(file, cache_dir)
+        if not invalidate_cache:
+            df = ler_cache(arquivo_cache, origem, columns)
+            if df is not None:
+                return df
+    try:
+        if dataset is None:
+            df = pd.read_csv(file, sep=';', encoding='latin1')
+        elif cache_dir is not None:
+            # O cache guarda todas as colunas do esquema; a projeção é feita depois
+            df = read_csv_esquema(file, dataset, list(ESQUEMAS[dataset]))
+        else:
+            df = read_csv_esquema(file, dataset, columns)
     except Exception as e:
         print(f"Erro ao carregar o arquivo '{file}': {e}")
-    return pd.DataFrame()
+        return pd.DataFrame()
+    if cache_dir is not None:
+        salvar_cache(df, arquivo_cache, origem)
+    if columns is not None:
+        df = df[[coluna for coluna in columns if coluna in df.columns]]
+    return df
+
+def concat_frames(df_list):
+    # Unifica as categorias antes do concat para não cair em dtype object
+    nao_vazios = [df for df in df_list if not df.empty]
+    if not nao_vazios:
+        return df_list[0] if df_list else pd.DataFrame()
+    df_list = nao_vazios
+    for coluna in df_list[0].columns:
+        if all(isinstance(df[coluna].dtype, pd.CategoricalDtype) for df in df_list if coluna in df):
+            categorias = union_categoricals([df[coluna] for df in df_list if coluna in df]).categories
+            for df in df_list:
+                if coluna in df:
+                    df[coluna] = df[coluna].cat.set_categories(categorias)
+    return pd.concat(df_list, ignore_index=True)
+
+def carregar_para_arrow(file, destino, **opcoes):
+    # Executado nos workers: em vez de devolver o DataFrame por pickle, grava um Arrow IPC
+    # sem compressão em destino e devolve só o caminho
+    df = load_file(file, **opcoes)
+    if df.empty:
+        return None
+    tabela = com_rotulos(pa.Table.from_pandas(df, preserve_index=False), df)
+    caminho = os.path.join(destino, hashlib.sha1(os.path.abspath(file).encode("utf-8")).hexdigest() + ".arrow")
+    with pa.OSFile(caminho, "wb") as sink, pa.ipc.new_file(sink, tabela.schema) as writer:
+        writer.write_table(tabela)
+    return caminho
+
+def ler_arrow_mapeado(caminho):
+    # Os buffers da tabela apontam para o arquivo mapeado em memória, sem cópia
+    with pa.memory_map(caminho) as fonte:
+        tabela = pa.ipc.open_file(fonte).read_all()
+    registrar_rotulos_esquema(tabela.schema)
+    return tabela
+
+def concat_tabelas(tabelas):
+    # Junta as tabelas sem copiar os dados; as colunas category (dictionary) ganham um
+    # dicionário único, na mesma ordem que union_categoricals daria
+    try:
+        # A largura dos códigos de cada dictionary depende do número de categorias do arquivo
+        esquema = pa.schema([
+            campo.with_type(pa.dictionary(pa.int32(), campo.type.value_type))
+            if pa.types.is_dictionary(campo.type) else campo
+            for campo in tabelas[0].schema
+        ], metadata=tabelas[0].schema.metadata)
+        tabelas = [tabela.cast(esquema) if tabela.schema != esquema else tabela for tabela in tabelas]
+        tabela = pa.concat_tables(tabelas).unify_dictionaries()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        # Tipos diferentes entre arquivos (sem esquema declarado): junta pelo pandas
+        return concat_frames([tabela.to_pandas() for tabela in tabelas])
+    return tabela.to_pandas(split_blocks=True)
+
+def valor_particao(chave, valor):
+    return int(valor) if chave == "ANO_ELEICAO" else str(valor).strip().upper()
+
+def particao_arquivo(file):
+    # {"ANO_ELEICAO": 2020, "SG_UF": "SC"}; fica de fora a chave que o caminho não informa.
+    # Arquivos nacionais (_2024_BRASIL.csv) não têm UF
+    particao = {}
+    for parte in os.path.normpath(os.path.dirname(file)).split(os.sep):
+        chave, separador, valor = parte.partition("=")
+        if separador and chave.lower() in CHAVES_PARTICAO and valor:
+            particao[CHAVES_PARTICAO[chave.lower()]] = valor
+    encontrado = PADRAO_PARTICAO_ARQUIVO.search(os.path.basename(file))
+    if encontrado:
+        particao.setdefault("ANO_ELEICAO", encontrado.group(1))
+        if encontrado.group(2) and len(encontrado.group(2)) == 2:
+            particao.setdefault("SG_UF", encontrado.group(2))
+    return {chave: valor_particao(chave, valor) for chave, valor in particao.items()}
+
+def filtros_particao(particoes):
+    return {
+        chave: {valor_particao(chave, valor) for valor in valores}
+        for chave, valores in (particoes or {}).items() if valores
+    }
 
-def load_data_from_folder(folder_path, file_pattern="*.csv"):
-    all_files = glob(os.path.join(folder_path, file_pattern))
-    
-    with ProcessPoolExecutor() as executor:
-        df_list = list(executor.map(load_file, all_files))
+def chaves_por_linha(file, dataset, filtros):
+    # Chaves filtradas que o caminho do arquivo não informa (consulta_cand_2024_BRASIL.csv não tem
+    # UF) e que o dataset traz como coluna: nesses arquivos, o filtro é aplicado linha a linha
+    particao = particao_arquivo(file)
+    return [chave for chave in filtros if chave not in particao and chave in ESQUEMAS.get(dataset, {})]
+
+def mascara_particoes(df, arquivos, tamanhos, dataset, filtros):
+    # Linhas de df (a concatenação dos arquivos, com tamanhos linhas cada) dentro das partições
+    mascara = np.ones(len(df), dtype=bool)
+    for chave, valores in filtros.items():
+        sem_particao = np.repeat([chave in chaves_por_linha(file, dataset, filtros) for file in arquivos], tamanhos)
+        if sem_particao.any():
+            mascara &= ~sem_particao | df[chave].isin(list(valores)).to_numpy(dtype=bool)
+    return mascara
+
+def listar_arquivos(folder_path, file_pattern="*.csv", particoes=None):
+    # Arquivos do dataset, na pasta e nas subpastas de partição. Com particoes
+    # ({"ANO_ELEICAO": [2020, 2024], "SG_UF": ["SC"]}), os arquivos das outras partições nem
+    # são abertos; os que não informam a partição são lidos e filtrados linha a linha
+    arquivos = sorted(glob(os.path.join(folder_path, "**", file_pattern), recursive=True))
+    filtros = filtros_particao(particoes)
+    selecionados = []
+    for file in arquivos:
+        particao = particao_arquivo(file)
+        if all(chave not in particao or particao[chave] in valores for chave, valores in filtros.items()):
+            selecionados.append(file)
+    return selecionados
+
+def inserir_ano(df, arquivos, tamanhos):
+    # ANO_ELEICAO vem da partição de cada arquivo, já que nem todo dataset traz a coluna
+    # (o de redes sociais a chama de AA_ELEICAO); é nula quando o caminho não informa o ano
+    if df.empty or "ANO_ELEICAO" in df.columns:
+        return df
+    anos = np.array([particao_arquivo(file).get("ANO_ELEICAO") for file in arquivos], dtype=object)
+    df.insert(0, "ANO_ELEICAO", pd.array(np.repeat(anos, tamanhos), dtype="Int16"))
+    return df
+
+def load_data_from_folder(folder_path, file_pattern="*.csv", use_cache=True,
+                          cache_dir=CACHE_DIR_PADRAO, invalidate_cache=False,
+                          dataset=None, columns=None, workers=None,
+                          limiar_processos=LIMIAR_CARGA_PROCESSOS, troca_dir=None, particoes=None):
+    all_files = listar_arquivos(folder_path, file_pattern, particoes)
+    # A coluna de partição entra quando pedida (ou sem projeção) e não é lida dos arquivos
+    com_ano = columns is None or "ANO_ELEICAO" in columns
+    if columns is not None:
+        columns = [coluna for coluna in columns if coluna != "ANO_ELEICAO"]
+    # Colunas lidas só para filtrar os arquivos que não informam a partição no caminho
+    filtros = filtros_particao(particoes)
+    extras = []
+    if columns is not None:
+        extras = sorted({chave for file in all_files for chave in chaves_por_linha(file, dataset, filtros)} - set(columns))
+        columns = columns + extras
+
+    def montar(df, arquivos, tamanhos):
+        mascara = mascara_particoes(df, arquivos, tamanhos, dataset, filtros)
+        if com_ano:
+            df = inserir_ano(df, arquivos, tamanhos)
+        if not mascara.all():
+            df = df[mascara].reset_index(drop=True)
+        return df.drop(columns=extras, errors="ignore")
+
+    cache_dir = cache_dir if use_cache else None
+    carregar = partial(
+        load_file,
+        cache_dir=cache_dir,
+        invalidate_cache=invalidate_cache,
+        dataset=dataset,
+        columns=columns
+    )
+
+    # Arquivos com cache válido são lidos aqui mesmo, direto como tabelas Arrow
+    tabelas = {}
+    if cache_dir is not None and not invalidate_cache:
+        projecao = list(ESQUEMAS[dataset]) if dataset is not None and columns is None else columns
+        for file in all_files:
+            tabela = tabela_cache(caminho_cache(file, cache_dir), origem_arquivo(file, dataset), projecao)
+            if tabela is not None:
+                tabelas[file] = tabela
+    a_converter = [file for file in all_files if file not in tabelas]
+
+    workers = min(workers or pool_carga.jobs or os.cpu_count(), len(a_converter))
+    if workers <= 1 or sum(os.path.getsize(file) for file in a_converter) < limiar_processos:
+        frames = [tabelas[file].to_pandas() if file in tabelas else carregar(file) for file in all_files]
+        tamanhos = [len(df) for df in frames]
+        return montar(concat_frames(frames), all_files, tamanhos)
+
+    # Os workers gravam as tabelas em arquivos (troca_dir pode ser /dev/shm), o processo
+    # principal os mapeia em memória e só copia os dados uma vez, na conversão para pandas
+    with tempfile.TemporaryDirectory(prefix="carga_", dir=troca_dir, ignore_cleanup_errors=True) as destino:
+        with pool_carga.executor_para(workers) as executor:
+            caminhos = executor.map(
+                partial(com_cpu, partial(carregar_para_arrow, destino=destino, **carregar.keywords)), a_converter
+            )
+            for file, (caminho, cpu) in zip(a_converter, caminhos):
+                METRICAS.somar_cpu_workers(cpu)
+                if caminho is not None:
+                    tabelas[file] = ler_arrow_mapeado(caminho)
+        carregados = [file for file in all_files if file in tabelas]
+        if not carregados:
+            return pd.DataFrame()
+        df = concat_tabelas([tabelas[file] for file in carregados])
+        return montar(df, carregados, [tabelas[file].num_rows for file in carregados])
+
+def iterar_blocos(folder_path, dataset, columns, chunksize=None, file_pattern="*.csv",
+                  use_cache=True, cache_dir=CACHE_DIR_PADRAO, invalidate_cache=False, particoes=None):
+    # Entrega um arquivo (UF) por vez ou, com chunksize, blocos de até chunksize linhas,
+    # sem nunca materializar o dataset inteiro em memória
+    filtros = filtros_particao(particoes)
+    for file in listar_arquivos(folder_path, file_pattern, particoes):
+        extras = [chave for chave in chaves_por_linha(file, dataset, filtros) if columns is not None and chave not in columns]
+        colunas = columns + extras if extras else columns
+
+        def filtrar(bloco):
+            mascara = mascara_particoes(bloco, [file], [len(bloco)], dataset, filtros)
+            return (bloco if mascara.all() else bloco[mascara]).drop(columns=extras, errors="ignore")
+
+        if chunksize is None:
+            df = filtrar(load_file(file, cache_dir if use_cache else None, invalidate_cache, dataset, colunas))
+            if not df.empty:
+                yield df
+            continue
+        try:
+            arquivo_cache = caminho_cache(file, cache_dir)
+            if use_cache and not invalidate_cache and cache_valido(arquivo_cache, origem_arquivo(file, dataset)):
+                arquivo = pq.ParquetFile(arquivo_cache)
+                registrar_rotulos_esquema(arquivo.schema_arrow)
+                lotes = arquivo.iter_batches(batch_size=chunksize, columns=colunas)
+                blocos = (lote.to_pandas() for lote in lotes)
+            else:
+                blocos = read_csv_esquema(file, dataset, colunas, chunksize)
+            yield from (filtrar(bloco) for bloco in blocos)
+        except Exception as e:
+            print(f"Erro ao carregar o arquivo '{file}': {e}")
+
+def combinar_parciais(parciais):
+    # Soma agregações parciais (contagens ou somas indexadas pelas chaves do groupby)
+    parciais = [parcial for parcial in parciais if parcial is not None]
+    combinado = pd.concat(parciais)
+    return combinado.groupby(level=list(range(combinado.index.nlevels)), observed=True).sum()
+
+
+# Engines de agregação: as duas executam as mesmas CONSULTAS e devolvem o mesmo formato
+
+def ordenar_resultado(resultado, grupos):
+    # Chaves sem dtype category e em ordem crescente, para que empates (idxmax, nlargest)
+    # sejam resolvidos igual nas duas engines
+    tabela = resultado.reset_index()
+    for coluna in grupos:
+        if isinstance(tabela[coluna].dtype, pd.CategoricalDtype):
+            tabela[coluna] = tabela[coluna].astype(tabela[coluna].cat.categories.dtype)
+    return tabela.set_index(grupos).iloc[:, 0].rename(resultado.name).sort_index()
+
+def dominios_url(serie):
+    # Domínio de cada URL ("https://www.instagram.com/x" ou "www.instagram.com/x" -> "www.instagram.com"),
+    # com operações vetorizadas do Arrow em vez de uma regex por linha. O "///" garante as três partes
+    urls = pa.array(serie, from_pandas=True)
+    urls = pc.binary_join_element_wise(urls, pa.scalar("///", urls.type), pa.scalar("", urls.type))
+    partes = pc.split_pattern(urls, "/", max_splits=3)
+    primeira, segunda, terceira = (pc.list_element(partes, i) for i in range(3))
+    com_esquema = pc.and_(pc.ends_with(primeira, ":"), pc.equal(segunda, ""))
+    dominios = pc.dictionary_encode(pc.if_else(com_esquema, terceira, primeira))
+    return pd.Series(dominios.to_pandas().values, index=serie.index, name=serie.name)
+
+def coluna_pandas(df, coluna):
+    if coluna not in COLUNAS_DERIVADAS:
+        return df[coluna]
+    tipo, origem, *argumentos = COLUNAS_DERIVADAS[coluna]
+    if tipo == "mapa":
+        return por_categoria(df[origem], lambda valores: valores.map(argumentos[0]), DOMINIOS.get(coluna)).rename(coluna)
+    # Só o domínio é extraído linha a linha; o padrão roda uma vez por domínio distinto
+    padrao, padrao_ausente = argumentos
+    dominios = dominios_url(df[origem])
+    classificar = lambda valores: valores.str.lower().str.extract(padrao, expand=False).fillna(padrao_ausente)
+    return por_categoria(dominios, classificar, DOMINIOS.get(coluna)).fillna(padrao_ausente).rename(coluna)
+
+def agregar_pandas(consulta, df, *anteriores):
+    mascara = None
+    for coluna, operador, valor in consulta.get("filtros", []):
+        if operador == "in":
+            condicao = df[coluna].isin(valor)
+        elif operador == "!=":
+            condicao = df[coluna] != valor
+        else:
+            condicao = df[coluna] == valor
+        mascara = condicao if mascara is None else mascara & condicao
+    if "semi_join" in consulta:
+        chave = consulta["semi_join"]
+        condicao = df[chave].isin(anteriores[0][chave])
+        mascara = condicao if mascara is None else mascara & condicao
+    if mascara is not None:
+        df = df[mascara]
+
+    if consulta["tipo"] == "selecao":
+        return df[consulta["colunas"]]
+    agrupado = df.groupby([coluna_pandas(df, coluna) for coluna in consulta["grupos"]], observed=True)
+    if consulta["tipo"] == "contagem":
+        resultado = agrupado.size()
+    else:
+        resultado = agrupado[consulta["valor"]].sum()
+    return ordenar_resultado(resultado, consulta["grupos"])
+
+def colunas_consulta(consulta):
+    colunas = set(consulta.get("colunas", []))
+    for coluna in consulta.get("grupos", []):
+        colunas.add(COLUNAS_DERIVADAS[coluna][1] if coluna in COLUNAS_DERIVADAS else coluna)
+    colunas.update(coluna for coluna, _, _ in consulta.get("filtros", []))
+    colunas.update(consulta[chave] for chave in ("valor", "semi_join") if chave in consulta)
+    return [coluna for coluna in ESQUEMAS[consulta["dataset"]] if coluna in colunas]
+
+def lista_sql(valores):
+    return "[" + ", ".join("'" + valor.replace("'", "''") + "'" for valor in valores) + "]"
+
+def rotulos_csv_duckdb(csvs, colunas):
+    # Grafias originais das colunas canônicas dos CSVs lidos direto pelo DuckDB, numa única leitura
+    listas = ", ".join(f'list(DISTINCT "{coluna}")' for coluna in colunas)
+    with duckdb.connect() as conexao:
+        distintos = conexao.execute(
+            f"SELECT {listas} FROM read_csv({lista_sql(csvs)}, delim=';', header=true, "
+            f"encoding='latin-1', all_varchar=true, union_by_name=true)"
+        ).fetchone()
+    for coluna, valores in zip(colunas, distintos):
+        canonizar(pd.Series(valores or [], dtype="category"), coluna)
+
+def cache_duckdb(file, dataset, use_cache, cache_dir, invalidate_cache):
+    # Cache Parquet do arquivo quando válido; None quando o DuckDB deve ler o próprio CSV
+    arquivo_cache = caminho_cache(file, cache_dir)
+    if use_cache and not invalidate_cache and cache_valido(arquivo_cache, origem_arquivo(file, dataset)):
+        return arquivo_cache
+    return None
+
+def rotulos_duckdb(insights, data_paths, file_pattern="*.csv", use_cache=True,
+                   cache_dir=CACHE_DIR_PADRAO, invalidate_cache=False, particoes=None):
+    # Grafias originais das colunas canônicas de todas as CONSULTAS dos insights, coletadas
+    # uma vez por dataset: do esquema do cache Parquet ou numa única leitura dos CSVs
+    colunas = {}
+    for numero in insights:
+        for consulta in CONSULTAS[numero]:
+            colunas.setdefault(consulta["dataset"], set()).update(
+                coluna for coluna in colunas_consulta(consulta) if coluna in COLUNAS_CANONICAS
+            )
+    for dataset, canonicas in colunas.items():
+        if not canonicas:
+            continue
+        csvs = []
+        for file in listar_arquivos(data_paths[dataset], file_pattern, particoes):
+            arquivo_cache = cache_duckdb(file, dataset, use_cache, cache_dir, invalidate_cache)
+            if arquivo_cache:
+                registrar_rotulos_esquema(pq.read_schema(arquivo_cache))
+            else:
+                csvs.append(file)
+        if csvs:
+            rotulos_csv_duckdb(csvs, [coluna for coluna in ESQUEMAS[dataset] if coluna in canonicas])
+
+def fonte_duckdb(folder_path, dataset, colunas, file_pattern="*.csv",
+                 use_cache=True, cache_dir=CACHE_DIR_PADRAO, invalidate_cache=False, particoes=None):
+    # SELECT sobre os arquivos do dataset: o cache Parquet quando válido, senão o próprio CSV.
+    # Só as colunas pedidas são lidas e os filtros da consulta são empurrados para a leitura
+    # Os arquivos que não informam a partição no caminho ganham um WHERE com os valores pedidos.
+    # Os rótulos já foram coletados por rotulos_duckdb
+    filtros = filtros_particao(particoes)
+    grupos = {}
+    for file in listar_arquivos(folder_path, file_pattern, particoes):
+        arquivo_cache = cache_duckdb(file, dataset, use_cache, cache_dir, invalidate_cache)
+        chaves = tuple(chaves_por_linha(file, dataset, filtros))
+        if arquivo_cache:
+            grupos.setdefault(("parquet", chaves), []).append(arquivo_cache)
+        else:
+            grupos.setdefault(("csv", chaves), []).append(file)
+    caixas = {"maiusculas": "upper", "minusculas": "lower"}
+
+    def expressao(coluna):
+        if coluna in COLUNAS_CANONICAS:
+            return f'{caixas[COLUNAS_CANONICAS[coluna]]}(trim(strip_accents("{coluna}")))'
+        return f'"{coluna}"'
+
+    projecao = ", ".join(
+        f'{expressao(coluna)} AS "{coluna}"' if coluna in COLUNAS_CANONICAS else f'"{coluna}"' for coluna in colunas
+    )
+    tipos = ", ".join(f"'{coluna}': '{TIPOS_DUCKDB[ESQUEMAS[dataset][coluna]]}'" for coluna in colunas)
+    partes = []
+    for (tipo, chaves), arquivos in grupos.items():
+        if tipo == "parquet":
+            leitura = f"read_parquet({lista_sql(arquivos)})"
+        else:
+            leitura = (
+                f"read_csv({lista_sql(arquivos)}, delim=';', header=true, encoding='latin-1', "
+                f"decimal_separator=',', all_varchar=true, union_by_name=true, types={{{tipos}}})"
+            )
+        sql = f"SELECT {projecao} FROM {leitura}"
+        if chaves:
+            sql += " WHERE " + " AND ".join(
+                f"list_contains({lista_sql(sorted(filtros[chave]))}, {expressao(chave)})" for chave in chaves
+            )
+        partes.append(sql)
+    return " UNION ALL ".join(partes) or None
+
+def expressao_sql(coluna, parametros):
+    if coluna not in COLUNAS_DERIVADAS:
+        return f'"{coluna}"'
+    tipo, origem, *argumentos = COLUNAS_DERIVADAS[coluna]
+    if tipo == "mapa":
+        casos = []
+        for chave, valor in argumentos[0].items():
+            casos.append("WHEN ? THEN ?")
+            parametros += [chave, valor]
+        return f'CASE "{origem}" {" ".join(casos)} END'
+    # Mesma regra de dominios_url
+    partes = [f"split_part(\"{origem}\", '/', {i})" for i in (1, 2, 3)]
+    dominio = f"CASE WHEN ends_with({partes[0]}, ':') AND {partes[1]} = '' THEN {partes[2]} ELSE {partes[0]} END"
+    parametros += argumentos
+    return f"coalesce(nullif(regexp_extract(lower({dominio}), ?, 1), ''), ?)"
+
+def agregar_duckdb(consulta, conexao, fonte, *anteriores):
+    parametros = []
+    if consulta["tipo"] == "selecao":
+        selecao = [f'"{coluna}"' for coluna in consulta["colunas"]]
+    else:
+        selecao = [f'{expressao_sql(coluna, parametros)} AS "{coluna}"' for coluna in consulta["grupos"]]
+        if "valor" in consulta:
+            selecao.append(f'"{consulta["valor"]}"')
+
+    condicoes = []
+    for coluna, operador, valor in consulta.get("filtros", []):
+        if operador == "in":
+            condicoes.append(f'"{coluna}" IN ({", ".join("?" * len(valor))})')
+            parametros += valor
+        else:
+            condicoes.append(f'"{coluna}" {"<>" if operador == "!=" else "="} ?')
+            parametros.append(valor)
+    if "semi_join" in consulta:
+        chave = consulta["semi_join"]
+        conexao.register("anterior", anteriores[0][[chave]])
+        condicoes.append(f'"{chave}" IN (SELECT "{chave}" FROM anterior)')
+
+    sql = f"SELECT {', '.join(selecao)} FROM ({fonte})"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    if consulta["tipo"] != "selecao":
+        # Como no groupby do pandas, chaves nulas ficam de fora
+        grupos = ", ".join(f'"{coluna}"' for coluna in consulta["grupos"])
+        agregado = "count(*)" if consulta["tipo"] == "contagem" else f'sum("{consulta["valor"]}")'
+        nao_nulos = " AND ".join(f'"{coluna}" IS NOT NULL' for coluna in consulta["grupos"])
+        sql = f'SELECT {grupos}, {agregado} AS "VALOR" FROM ({sql}) WHERE {nao_nulos} GROUP BY {grupos}'
 
-    return pd.concat(df_list, ignore_index=True) if df_list else pd.DataFrame()
+    try:
+        tabela = conexao.execute(sql, parametros).df()
+    finally:
+        if "semi_join" in consulta:
+            conexao.unregister("anterior")
+    if consulta["tipo"] == "selecao":
+        return tabela
+    resultado = tabela.set_index(consulta["grupos"])["VALOR"].rename(consulta.get("valor"))
+    if consulta["tipo"] == "soma":
+        resultado = resultado.fillna(0.0)
+    return ordenar_resultado(resultado, consulta["grupos"])
 
 
 # Funções para cada insight
 
+def parcial_1_prefeitos_eleitos(dados_candidatos):
+    return agregar_pandas(CONSULTAS[1][0], dados_candidatos)
+
+def parcial_1_bens_prefeitos(dados_bens, prefeitos_eleitos):
+    return agregar_pandas(CONSULTAS[1][1], dados_bens, prefeitos_eleitos)
+
+def finalizar_1_economia_influencia_eleicao(prefeitos_eleitos, total_bens_por_candidato):
+    if prefeitos_eleitos.empty:
+        print("Nenhum prefeito eleito encontrado nos dados de candidatos.")
+        return
+
+    total_bens_por_candidato = total_bens_por_candidato.reset_index()
+
+    if total_bens_por_candidato.empty:
+        print("Nenhum bem declarado encontrado para os prefeitos eleitos.")
+        return
+
+    top_10_bens = total_bens_por_candidato.nlargest(10, 'VR_BEM_CANDIDATO')
+    top_10_bens = top_10_bens.merge(prefeitos_eleitos, on='SQ_CANDIDATO')
+    salvar_csv(top_10_bens, "output/total_bens_prefeitos_eleitos.csv")
+
+    renderizar("total_bens_prefeitos_eleitos", top_10_bens)
+
 def insight_1_economia_influencia_eleicao(dados_candidatos, dados_bens):
     print("\nInsight 1: Economia e Influência na Eleição")
     
     try:
-        prefeitos_eleitos = dados_candidatos[
-            (dados_candidatos['DS_CARGO'].str.lower() == 'prefeito') &
-            (dados_candidatos['DS_SIT_TOT_TURNO'].str.lower() == 'eleito')
-        ][['SQ_CANDIDATO', 'NM_CANDIDATO']]
-
-        if prefeitos_eleitos.empty:
-            print("Nenhum prefeito eleito encontrado nos dados de candidatos.")
-            return
-        
-        dados_bens['VR_BEM_CANDIDATO'] = pd.to_numeric(
-            dados_bens['VR_BEM_CANDIDATO'].replace(',', '.', regex=True), errors='coerce'
+        prefeitos_eleitos = parcial_1_prefeitos_eleitos(dados_candidatos)
+        finalizar_1_economia_influencia_eleicao(
+            prefeitos_eleitos, parcial_1_bens_prefeitos(dados_bens, prefeitos_eleitos)
         )
+    except Exception as e:
+        print(f"Erro no insight 1 - economia_influencia_eleicao: {e}")
 
-        bens_eleitos = dados_bens[dados_bens['SQ_CANDIDATO'].isin(prefeitos_eleitos['SQ_CANDIDATO'])]
-        total_bens_por_candidato = bens_eleitos.groupby('SQ_CANDIDATO')['VR_BEM_CANDIDATO'].sum().reset_index()
 
-        if total_bens_por_candidato.empty:
-            print("Nenhum bem declarado encontrado para os prefeitos eleitos.")
-            return
+def parcial_2_eleitos_coligacao(dados_candidatos):
+    return agregar_pandas(CONSULTAS[2][0], dados_candidatos)
 
-        top_10_bens = total_bens_por_candidato.nlargest(10, 'VR_BEM_CANDIDATO')
-        top_10_bens = top_10_bens.merge(prefeitos_eleitos, on='SQ_CANDIDATO')
-        top_10_bens.to_csv("output/total_bens_prefeitos_eleitos.csv", index=False)
+def parcial_2_coligacoes(dados_coligacoes, eleitos_por_coligacao):
+    return agregar_pandas(CONSULTAS[2][1], dados_coligacoes)
 
-        plt.figure(figsize=(12, 8))
-        sns.barplot(
-            data=top_10_bens, 
-            x='NM_CANDIDATO', 
-            y='VR_BEM_CANDIDATO', 
-            color='blue'
-        )
-        plt.title("Top 10 Prefeitos Eleitos com Maior Total de Bens Declarados")
-        plt.xlabel("Nome do Candidato")
-        plt.ylabel("Total de Bens Declarados (R$)")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        plt.savefig("output/total_bens_prefeitos_eleitos.png")
-        plt.show()
-        plt.close()
-
-    except Exception as e:
-        print(f"Erro no insight 1 - economia_influencia_eleicao: {e}")
+def finalizar_2_coligacoes_disputas_vitoria(eleitos_por_coligacao, dados_coligacoes):
+    dados_coligacoes = dados_coligacoes.assign(
+        NUMERO_PARTIDOS=dados_coligacoes['DS_COMPOSICAO_FEDERACAO'].str.count(',') + 1
+    )
+    coligacoes_resultados = eleitos_por_coligacao.reset_index(name='NUM_ELEITOS')
 
+    coligacoes_detalhadas = dados_coligacoes.merge(coligacoes_resultados, on='SQ_COLIGACAO', how='left')
+    coligacoes_detalhadas['NUM_ELEITOS'] = coligacoes_detalhadas['NUM_ELEITOS'].fillna(0)
+    coligacoes_detalhadas = coligacoes_detalhadas.sort_values(by=['NUMERO_PARTIDOS', 'NUM_ELEITOS'], ascending=[False, False])
+    salvar_csv(coligacoes_detalhadas, "output/coligacoes_detalhadas.csv")
+    
+    renderizar("coligacoes_eleitos", coligacoes_detalhadas)
 
 def insight_2_coligacoes_disputas_vitoria(dados_candidatos, dados_coligacoes):
     print("Insight 2: Coligações e Disputas de Vitória")
     try:
-        dados_coligacoes['NUMERO_PARTIDOS'] = dados_coligacoes['DS_COMPOSICAO_FEDERACAO'].str.count(',') + 1
-        
-        coligacoes_eleitos = dados_candidatos[dados_candidatos['DS_SIT_TOT_TURNO'].str.lower() == 'eleito']
-        coligacoes_resultados = coligacoes_eleitos.groupby(['SQ_COLIGACAO', 'SG_UF']).size().reset_index(name='NUM_ELEITOS')
-
-        coligacoes_detalhadas = dados_coligacoes.merge(coligacoes_resultados, on='SQ_COLIGACAO', how='left')
-        coligacoes_detalhadas['NUM_ELEITOS'] = coligacoes_detalhadas['NUM_ELEITOS'].fillna(0)
-        coligacoes_detalhadas = coligacoes_detalhadas.sort_values(by=['NUMERO_PARTIDOS', 'NUM_ELEITOS'], ascending=[False, False])
-        coligacoes_detalhadas.to_csv("output/coligacoes_detalhadas.csv", index=False)
-        
-        plt.figure(figsize=(14, 8))
-        
-        scatter = sns.scatterplot(
-            data=coligacoes_detalhadas, 
-            x='NUMERO_PARTIDOS', 
-            y='NUM_ELEITOS', 
-            size='NUM_ELEITOS', 
-            hue='SG_UF_x', 
-            sizes=(40, 400),
-            alpha=0.7, 
-            legend='full'
+        eleitos_por_coligacao = parcial_2_eleitos_coligacao(dados_candidatos)
+        finalizar_2_coligacoes_disputas_vitoria(
+            eleitos_por_coligacao, parcial_2_coligacoes(dados_coligacoes, eleitos_por_coligacao)
         )
-
-        plt.title("Coligações: Número de Eleitos por Número de Partidos e UF")
-        plt.xlabel("Número de Partidos na Coligação")
-        plt.ylabel("Número de Eleitos")
-        scatter.xaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-
-        plt.savefig("output/coligacoes_eleitos.png")
-        plt.show()
-        
     except Exception as e:
         print(f"Erro no insight 2 - coligacoes_disputas_vitoria: {e}")
 
 
 
+def parcial_3_maior_partido_uf(dados_candidatos):
+    return agregar_pandas(CONSULTAS[3][0], dados_candidatos)
+
+def finalizar_3_maior_partido_uf(partidos_por_uf):
+    partidos_por_uf = partidos_por_uf.reset_index(name='NUM_CANDIDATOS')
+    maior_partido_por_uf = partidos_por_uf.loc[partidos_por_uf.groupby('SG_UF', observed=True)['NUM_CANDIDATOS'].idxmax()]
+    salvar_csv(maior_partido_por_uf, "output/maior_partido_por_uf.csv")
+
+    renderizar("partido_maior_por_uf", maior_partido_por_uf)
+
 def insight_3_maior_partido_uf(dados_candidatos):
     print("Insight 3: Maior Partido por UF")
     try:
-        partidos_por_uf = dados_candidatos.groupby(['SG_UF', 'SG_PARTIDO']).size().reset_index(name='NUM_CANDIDATOS')
-        maior_partido_por_uf = partidos_por_uf.loc[partidos_por_uf.groupby('SG_UF')['NUM_CANDIDATOS'].idxmax()]
-        maior_partido_por_uf.to_csv("output/maior_partido_por_uf.csv", index=False)
-
-        plt.figure(figsize=(10, 8))
-        sns.barplot(data=maior_partido_por_uf, y='SG_UF', x='NUM_CANDIDATOS', hue='SG_PARTIDO', dodge=False)
-        plt.title("Partido com Maior Quantidade de Candidatos por UF")
-        plt.xlabel("Número de Candidatos")
-        plt.ylabel("UF")
-        plt.legend(title="Partido")
-        plt.savefig("output/partido_maior_por_uf.png")
-        plt.close()
+        finalizar_3_maior_partido_uf(parcial_3_maior_partido_uf(dados_candidatos))
     except Exception as e:
         print(f"Erro no insight 3 - maior_partido_uf: {e}")
 
+def parcial_4_tendencia_regional_partido(dados_candidatos):
+    return agregar_pandas(CONSULTAS[4][0], dados_candidatos)
+
+def finalizar_4_tendencia_regional_partido(candidatos_por_regiao):
+    candidatos_por_regiao = candidatos_por_regiao.reset_index(name='NUM_CANDIDATOS')
+    salvar_csv(candidatos_por_regiao, "output/distribuicao_partido_regiao.csv")
+
+    renderizar("distribuicao_partido_regiao", candidatos_por_regiao)
+
 def insight_4_tendencia_regional_partido(dados_candidatos):
     print("Insight 4: Tendência Regional por Partido")
     try:
-        ufs_para_regioes = {
-            "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
-            "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
-            "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
-            "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
-            "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
-            "PR": "Sul", "RS": "Sul", "SC": "Sul"
-        }
-        dados_candidatos['REGIAO'] = dados_candidatos['SG_UF'].map(ufs_para_regioes)
-        candidatos_por_regiao = dados_candidatos.groupby(['REGIAO', 'SG_PARTIDO']).size().reset_index(name='NUM_CANDIDATOS')
-        candidatos_por_regiao.to_csv("output/distribuicao_partido_regiao.csv", index=False)
-
-        plt.figure(figsize=(12, 6))
-        sns.barplot(data=candidatos_por_regiao, x='REGIAO', y='NUM_CANDIDATOS', hue='SG_PARTIDO')
-        plt.title("Distribuição de Candidaturas por Partido e Região")
-        plt.xlabel("Região")
-        plt.ylabel("Número de Candidatos")
-        plt.legend(title="Partido", bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.savefig("output/distribuicao_partido_regiao.png")
-        plt.close()
+        finalizar_4_tendencia_regional_partido(parcial_4_tendencia_regional_partido(dados_candidatos))
     except Exception as e:
         print(f"Erro no insight 4 - tendencia_regional_partido: {e}")
 
+def parcial_5_partido_dominante_cargo(dados_candidatos):
+    return agregar_pandas(CONSULTAS[5][0], dados_candidatos)
+
+def finalizar_5_partido_dominante_cargo(partido_dominante_uf):
+    partido_dominante_uf = partido_dominante_uf.reset_index(name='TOTAL_CANDIDATOS')
+    partido_dominante_uf = partido_dominante_uf.loc[partido_dominante_uf.groupby('SG_UF', observed=True)['TOTAL_CANDIDATOS'].idxmax()]
+    salvar_csv(partido_dominante_uf, "output/partido_dominante_uf.csv")
+
+    renderizar("partido_dominante_por_uf", partido_dominante_uf)
+
 def insight_5_partido_dominante_cargo(dados_candidatos):
     print("Insight 5: Partido Dominante por Cargo")
     try:
-        cargos_importantes = ['prefeito', 'vice-prefeito', 'vereador']
-        dados_cargos = dados_candidatos[dados_candidatos['DS_CARGO'].isin(cargos_importantes)]
-        partido_dominante_uf = dados_cargos.groupby(['SG_UF', 'SG_PARTIDO']).size().reset_index(name='TOTAL_CANDIDATOS')
-        partido_dominante_uf = partido_dominante_uf.loc[partido_dominante_uf.groupby('SG_UF')['TOTAL_CANDIDATOS'].idxmax()]
-        partido_dominante_uf.to_csv("output/partido_dominante_uf.csv", index=False)
-
-        plt.figure(figsize=(10, 8))
-        sns.barplot(data=partido_dominante_uf, y='SG_UF', x='TOTAL_CANDIDATOS', hue='SG_PARTIDO', dodge=False)
-        plt.title("Partido Dominante por UF (Prefeito, Vice e Vereadores)")
-        plt.xlabel("Total de Candidatos")
-        plt.ylabel("UF")
-        plt.legend(title="Partido")
-        plt.savefig("output/partido_dominante_por_uf.png")
-        plt.close()
+        finalizar_5_partido_dominante_cargo(parcial_5_partido_dominante_cargo(dados_candidatos))
     except Exception as e:
         print(f"Erro no insight 5 - partido_dominante_cargo: {e}")
 
-def insight_6_candidatos_indigenas_quilombolas(dados_candidatos, dados_info_complementar):
-    print("Insight 6: Candidatos Indígenas e Quilombolas")
-    try:
-        ufs_para_regioes = {
-            "AC": "Norte", "AP": "Norte", "AM": "Norte", "PA": "Norte", "RO": "Norte", "RR": "Norte", "TO": "Norte",
-            "AL": "Nordeste", "BA": "Nordeste", "CE": "Nordeste", "MA": "Nordeste", "PB": "Nordeste",
-            "PE": "Nordeste", "PI": "Nordeste", "RN": "Nordeste", "SE": "Nordeste",
-            "DF": "Centro-Oeste", "GO": "Centro-Oeste", "MT": "Centro-Oeste", "MS": "Centro-Oeste",
-            "ES": "Sudeste", "MG": "Sudeste", "RJ": "Sudeste", "SP": "Sudeste",
-            "PR": "Sul", "RS": "Sul", "SC": "Sul"
-        }
-        candidatos_indigenas = dados_info_complementar[dados_info_complementar['CD_ETNIA_INDIGENA'] != 0]
-        candidatos_quilombolas = dados_info_complementar[dados_info_complementar['ST_QUILOMBOLA'] == 'S']
-        candidatos_indigenas['REGIAO'] = candidatos_indigenas['SG_UF'].map(ufs_para_regioes)
-        candidatos_quilombolas['REGIAO'] = candidatos_quilombolas['SG_UF'].map(ufs_para_regioes)
+def parcial_6_indigenas_regiao(dados_info_complementar):
+    return agregar_pandas(CONSULTAS[6][0], dados_info_complementar)
 
-        indigenas_por_regiao = candidatos_indigenas.groupby('REGIAO').size().reset_index(name='NUM_INDIGENAS')
-        quilombolas_por_regiao = candidatos_quilombolas.groupby('REGIAO').size().reset_index(name='NUM_QUILOMBOLAS')
+def parcial_6_quilombolas_regiao(dados_info_complementar, indigenas_por_regiao):
+    return agregar_pandas(CONSULTAS[6][1], dados_info_complementar)
 
-        indigenas_por_regiao.to_csv("output/indigenas_por_regiao.csv", index=False)
-        quilombolas_por_regiao.to_csv("output/quilombolas_por_regiao.csv", index=False)
+def finalizar_6_candidatos_indigenas_quilombolas(indigenas_por_regiao, quilombolas_por_regiao):
+    indigenas_por_regiao = indigenas_por_regiao.reset_index(name='NUM_INDIGENAS')
+    quilombolas_por_regiao = quilombolas_por_regiao.reset_index(name='NUM_QUILOMBOLAS')
 
-        fig, ax = plt.subplots(1, 2, figsize=(14, 6))
-        sns.barplot(data=indigenas_por_regiao, x='REGIAO', y='NUM_INDIGENAS', ax=ax[0], palette="Blues")
-        ax[0].set_title("Número de Candidatos Indígenas por Região")
+    salvar_csv(indigenas_por_regiao, "output/indigenas_por_regiao.csv")
+    salvar_csv(quilombolas_por_regiao, "output/quilombolas_por_regiao.csv")
 
-        sns.barplot(data=quilombolas_por_regiao, x='REGIAO', y='NUM_QUILOMBOLAS', ax=ax[1], palette="Greens")
-        ax[1].set_title("Número de Candidatos Quilombolas por Região")
+    renderizar("indigenas_quilombolas_regiao", indigenas_por_regiao, quilombolas_por_regiao)
 
-        plt.tight_layout()
-        plt.savefig("output/indigenas_quilombolas_regiao.png")
-        plt.close()
+def insight_6_candidatos_indigenas_quilombolas(dados_info_complementar):
+    print("Insight 6: Candidatos Indígenas e Quilombolas")
+    try:
+        finalizar_6_candidatos_indigenas_quilombolas(
+            parcial_6_indigenas_regiao(dados_info_complementar),
+            parcial_6_quilombolas_regiao(dados_info_complementar, None)
+        )
     except Exception as e:
         print(f"Erro no insight 6 - candidatos_indigenas_quilombolas: {e}")
 
+def parcial_7_rede_social_preferida(dados_redes_sociais):
+    return agregar_pandas(CONSULTAS[7][0], dados_redes_sociais)
+
+def finalizar_7_rede_social_preferida(redes_por_partido_uf):
+    redes_por_partido_uf = redes_por_partido_uf.reset_index(name='NUM_CANDIDATOS')
+    salvar_csv(redes_por_partido_uf, "output/redes_por_partido_uf.csv")
+
+    renderizar("rede_social_uf", redes_por_partido_uf)
+
 def insight_7_rede_social_preferida(dados_redes_sociais):
     print("Insight 7: Rede Social Preferida")
     try:
-        dados_redes_sociais['TIPO_REDE'] = dados_redes_sociais['DS_URL'].str.extract(r'(facebook|instagram|twitter|youtube|linkedin)', expand=False).fillna('outros')
-        redes_por_partido_uf = dados_redes_sociais.groupby(['SG_UF', 'TIPO_REDE']).size().reset_index(name='NUM_CANDIDATOS')
-        redes_por_partido_uf.to_csv("output/redes_por_partido_uf.csv", index=False)
-
-        plt.figure(figsize=(12, 6))
-        sns.countplot(data=dados_redes_sociais, x='SG_UF', hue='TIPO_REDE', order=sorted(dados_redes_sociais['SG_UF'].unique()))
-        plt.title("Rede Social Preferida dos Candidatos por UF")
-        plt.xlabel("UF")
-        plt.ylabel("Número de Candidatos")
-        plt.legend(title="Rede Social", bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.savefig("output/rede_social_uf.png")
-        plt.close()
+        finalizar_7_rede_social_preferida(parcial_7_rede_social_preferida(dados_redes_sociais))
     except Exception as e:
         print(f"Erro no insight 7 - rede_social_preferida: {e}")
 
-def insight_8_termos_propostas_governo(stop_words, path_propostas='./data/candidatos_propostas_governo/SC/'):
+def insight_8_termos_propostas_governo(stop_words, ufs=None, chunksize=8, path_propostas=PATH_PROPOSTAS):
     try:
-        all_terms = []
-        with ProcessPoolExecutor() as executor:
-            results = list(executor.map(
-                process_pdf_file, os.listdir(path_propostas), [path_propostas] * len(os.listdir(path_propostas))
-            ))
-        for text in results:
-            tokens = [word for word in text.lower().split() if word.isalpha() and word not in stop_words]
-            all_terms.extend(tokens)
-        termos_frequentes = Counter(all_terms).most_common(10)
-        pd.DataFrame(termos_frequentes, columns=['Termo', 'Frequência']).to_csv("output/termos_propostas.csv", index=False)
-
-        text = ' '.join([term for term, _ in termos_frequentes])
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title("Principais Termos nas Propostas de Governo")
-        plt.savefig("output/nuvem_termos_propostas.png")
-        plt.close()
+        arquivos = listar_propostas(ufs, path_propostas)
+        lotes = [arquivos[i:i + chunksize] for i in range(0, len(arquivos), chunksize)]
+        with etapa("extracao e contagem de termos dos PDFs", "extracao", linhas=len(arquivos)):
+            with pool_carga.executor_para() as executor:
+                resultados = list(executor.map(partial(com_cpu, partial(contar_termos_lote, stop_words=stop_words)), lotes))
+            contagens = [contagem for contagem, _ in resultados]
+            METRICAS.somar_cpu_workers(sum(cpu for _, cpu in resultados))
+        termos_frequentes = mesclar_contadores(contagens).most_common(10)
+        termos = pd.DataFrame(termos_frequentes, columns=['Termo', 'Frequência'])
+        salvar_csv(termos, "output/termos_propostas.csv")
+
+        renderizar("nuvem_termos_propostas", termos)
     except Exception as e:
         print(f"Erro no insight 8 - termos_propostas: {e}")
 
+def chave_municipio(nomes):
+    # Chave de junção: sem acentos, sem pontuação e em caixa baixa ("São Luís" -> "sao luis")
+    return (
+        nomes.astype(str).str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore').str.decode('ascii')
+        .str.casefold()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
 def insight_9_mapa_resultados_eleicao(dados_candidatos, dados_municipios):
     try:
         candidatos_eleitos = dados_candidatos[
-            (dados_candidatos['DS_SIT_TOT_TURNO'].str.lower() == 'eleito') &
-            (dados_candidatos['DS_CARGO'].str.lower() == 'prefeito')
-        ].copy()
-        
-        candidatos_eleitos.loc[:, 'NM_UE'] = candidatos_eleitos['NM_UE'].str.lower()
-        candidatos_eleitos.loc[:, 'SG_UF'] = candidatos_eleitos['SG_UF'].str.lower()
-        dados_municipios.loc[:, 'MUNICIPIO'] = dados_municipios['MUNICIPIO'].str.lower()
-        dados_municipios.loc[:, 'SG_UF'] = dados_municipios['SG_UF'].str.lower()
-        
-        resultados_municipios = pd.merge(
-            candidatos_eleitos[['NM_UE', 'SG_PARTIDO', 'SG_UF']],
-            dados_municipios[['MUNICIPIO', 'LATITUDE', 'LONGITUDE', 'SG_UF']],
-            left_on=['NM_UE', 'SG_UF'],
-            right_on=['MUNICIPIO', 'SG_UF'],
-            how='inner'
-        )
+            (dados_candidatos['DS_SIT_TOT_TURNO'] == 'eleito') &
+            (dados_candidatos['DS_CARGO'] == 'prefeito')
+        ]
 
-        resultados_municipios = resultados_municipios.rename(columns={
-            'NM_UE': 'MUNICIPIO',
-            'SG_PARTIDO': 'PARTIDO_VENCEDOR'
+        # A chave é calculada uma vez por nome distinto e depois replicada por linha
+        nomes = candidatos_eleitos['NM_UE'].astype('category')
+        chaves = chave_municipio(nomes.cat.categories.to_series())
+        # SG_UF já vem canônica e com o dicionário compartilhado; a junção compara os códigos
+        eleitos = pd.DataFrame({
+            'CHAVE': chaves.values.take(nomes.cat.codes.values),
+            'SG_UF': candidatos_eleitos['SG_UF'].values,
+            'PARTIDO_VENCEDOR': rotular(candidatos_eleitos['SG_PARTIDO'], 'SG_PARTIDO').astype(str).values,
         })
-
-        resultados_municipios = resultados_municipios[['MUNICIPIO', 'LATITUDE', 'LONGITUDE', 'PARTIDO_VENCEDOR']]
-        
-        mapa_brasil = folium.Map(location=[-15.7801, -47.9292], zoom_start=4)
-
-        partidos_unicos = resultados_municipios['PARTIDO_VENCEDOR'].unique()
-        num_partidos = len(partidos_unicos)
-        
-        colormap = plt.get_cmap('Set1', num_partidos)
-        cores_partidos = {partido: mcolors.to_hex(colormap(i / num_partidos)) for i, partido in enumerate(partidos_unicos)}
-
-        for _, row in resultados_municipios.iterrows():
-            folium.CircleMarker(
-                location=(row['LATITUDE'], row['LONGITUDE']),
-                radius=6,
-                color=cores_partidos.get(row['PARTIDO_VENCEDOR'], 'gray'),
-                fill=True,
-                fill_opacity=0.7,
-                popup=row['MUNICIPIO']
-            ).add_to(mapa_brasil)
-
-        mapa_brasil.save("output/resultado_eleicoes_mapa.html")
-        print("Mapa gerado e salvo como 'output/resultado_eleicoes_mapa.html'")
-        
+        municipios = pd.DataFrame({
+            'CHAVE': chave_municipio(dados_municipios['MUNICIPIO']).values,
+            'SG_UF': canonizar(dados_municipios['SG_UF'], 'SG_UF').values,
+            'MUNICIPIO': dados_municipios['MUNICIPIO'].values,
+            'LATITUDE': dados_municipios['LATITUDE'].values,
+            'LONGITUDE': dados_municipios['LONGITUDE'].values,
+        }).drop_duplicates(['CHAVE', 'SG_UF'])
+
+        resultados_municipios = eleitos.merge(municipios, on=['CHAVE', 'SG_UF'], how='inner')
+        resultados_municipios = resultados_municipios[['MUNICIPIO', 'SG_UF', 'PARTIDO_VENCEDOR', 'LATITUDE', 'LONGITUDE']]
+        salvar_csv(resultados_municipios, "output/resultado_eleicoes_municipios.csv")
+        renderizar("resultado_eleicoes_mapa", resultados_municipios)
     except Exception as e:
         print(f"Erro no insight 9 - mapa_resultados_eleicao: {e}")
 
 
-def main():
+def montar_fato_candidatos(dados_candidatos, dados_bens, dados_info_complementar,
+                           dados_redes_sociais=None, dados_coligacoes=None):
+    # Uma linha por candidatura, ordenada por ANO_ELEICAO e SQ_CANDIDATO, com os outros datasets
+    # já agregados por candidato: cada dataset é agrupado uma vez e alinhado pela chave, sem merges.
+    # A chave inclui o ano quando ele foi carregado, para que eleições diferentes não se misturem.
+    # Quem disputou o segundo turno aparece em duas linhas; vale a do último turno
+    chave = [coluna for coluna in ['ANO_ELEICAO', 'SQ_CANDIDATO'] if coluna in dados_candidatos.columns]
+    turnos = ['NR_TURNO'] if 'NR_TURNO' in dados_candidatos.columns else []
+    fato = (
+        dados_candidatos.sort_values(chave + turnos, kind='stable')
+        .drop_duplicates(chave, keep='last')
+        .reset_index(drop=True)
+    )
+    fato = fato[chave + [coluna for coluna in fato.columns if coluna not in chave]]
+    if 'SG_UF' in fato.columns:
+        fato.insert(fato.columns.get_loc('SG_UF') + 1, 'REGIAO', coluna_pandas(fato, 'REGIAO'))
+    candidatos = pd.MultiIndex.from_frame(fato[chave]) if len(chave) > 1 else pd.Index(fato['SQ_CANDIDATO'])
+
+    def alinhar(agregado):
+        # Valor de cada candidatura num agregado indexado pela chave; ausentes ficam nulos
+        return pd.Series(agregado.reindex(candidatos).values, index=fato.index)
+
+    if dados_bens.empty:
+        bens = pd.DataFrame(columns=['TOTAL', 'QUANTIDADE'], dtype='float64')
+    else:
+        bens = dados_bens.groupby(chave)['VR_BEM_CANDIDATO'].agg(TOTAL='sum', QUANTIDADE='size')
+    fato['TOTAL_BENS'] = alinhar(bens['TOTAL']).fillna(0.0)
+    fato['NUM_BENS'] = alinhar(bens['QUANTIDADE']).fillna(0).astype('int64')
+
+    if dados_info_complementar.empty:
+        info = pd.DataFrame(columns=['CD_ETNIA_INDIGENA', 'ST_QUILOMBOLA'])
+    else:
+        info = dados_info_complementar.drop_duplicates(chave).set_index(chave)
+    etnia = alinhar(info['CD_ETNIA_INDIGENA'])
+    fato['ETNIA_INDIGENA'] = (etnia.notna() & (etnia.fillna(0) != 0)).astype(bool)
+    fato['ST_QUILOMBOLA'] = alinhar(info['ST_QUILOMBOLA']).astype(str) == 'S'
+
+    if dados_redes_sociais is not None:
+        # Uma coluna TEM_<REDE> por rede de TIPO_REDE e o total de perfis informados
+        if dados_redes_sociais.empty:
+            perfis = pd.DataFrame(columns=DOMINIOS['TIPO_REDE'], dtype='int64')
+        else:
+            redes = dados_redes_sociais[chave].assign(TIPO_REDE=coluna_pandas(dados_redes_sociais, 'TIPO_REDE'))
+            perfis = redes.groupby(chave + ['TIPO_REDE'], observed=False).size().unstack(fill_value=0)
+        for rede in DOMINIOS['TIPO_REDE']:
+            fato[f'TEM_{rede.upper()}'] = alinhar(perfis[rede] > 0).fillna(False).astype(bool)
+        fato['NUM_REDES'] = alinhar(perfis.sum(axis=1)).fillna(0).astype('int64')
+
+    if dados_coligacoes is not None:
+        # Cada linha do arquivo de coligações é um partido da coligação
+        chave_coligacao = chave[:-1] + ['SQ_COLIGACAO']
+        if dados_coligacoes.empty:
+            partidos = pd.Series(dtype='int64')
+        else:
+            partidos = dados_coligacoes.groupby(chave_coligacao).size()
+        coligacoes = (
+            pd.MultiIndex.from_frame(fato[chave_coligacao]) if len(chave_coligacao) > 1 else pd.Index(fato['SQ_COLIGACAO'])
+        )
+        fato['NUM_PARTIDOS_COLIGACAO'] = pd.Series(partidos.reindex(coligacoes).values, index=fato.index).astype('Int64')
+    return fato
 
-    data_paths = {
-        "candidatos": "./data/candidatos/",
-        "candidatos_bens": "./data/candidatos_bens/",
-        "candidatos_info_complementar": "./data/candidatos_info_complementar/",
-        "candidatos_redes_sociais": "./data/candidatos_redes_sociais/",
-        "coligacoes": "./data/coligacoes/",
-        "motivo_cassacao": "./data/motivo_cassacao/",
-        "vagas": "./data/vagas/"
-    }
+def ler_fato_candidatos(filtros=None, colunas=None, caminho=FATO_PATH):
+    # Filtros no formato do pyarrow, ex.: [("SQ_CANDIDATO", "==", 250002345678)] ou um intervalo com
+    # ">=" e "<"; só os row groups cujo mínimo e máximo podem conter a chave são lidos
+    return pq.read_table(caminho, columns=colunas, filters=filtros).to_pandas()
 
-    dados_candidatos = load_data_from_folder(data_paths["candidatos"])
-    dados_bens = load_data_from_folder(data_paths["candidatos_bens"])
-    dados_info_complementar = load_data_from_folder(data_paths["candidatos_info_complementar"])
-    dados_redes_sociais = load_data_from_folder(data_paths["candidatos_redes_sociais"])
-    dados_coligacoes = load_data_from_folder(data_paths["coligacoes"])
-    dados_motivo_cassacao = load_data_from_folder(data_paths["motivo_cassacao"])
-    dados_vagas = load_data_from_folder(data_paths["vagas"])
+def insight_11_fato_candidatos(dados_candidatos, dados_bens, dados_info_complementar,
+                               dados_redes_sociais, dados_coligacoes):
+    print("Insight 11: Tabela Fato de Candidaturas")
+    try:
+        fato = montar_fato_candidatos(
+            dados_candidatos, dados_bens, dados_info_complementar, dados_redes_sociais, dados_coligacoes
+        )
+        with etapa(f"escrita {FATO_PATH}", "escrita", linhas=len(fato)), escrita_atomica(FATO_PATH) as temporario:
+            pq.write_table(
+                pa.Table.from_pandas(exibir(fato), preserve_index=False), temporario,
+                row_group_size=LINHAS_GRUPO_FATO, write_statistics=True, write_page_index=True,
+                sorting_columns=[pq.SortingColumn(i) for i in range(fato.columns.get_loc('SQ_CANDIDATO') + 1)]
+            )
+        print(f"Tabela fato com {len(fato)} candidaturas salva em '{FATO_PATH}'")
+    except Exception as e:
+        print(f"Erro no insight 11 - fato_candidatos: {e}")
 
+def insight_10_cubo_candidatos(dados_candidatos, dados_bens, dados_info_complementar):
+    print("Insight 10: Cubo Pré-Agregado de Candidaturas")
     try:
-        assert not dados_candidatos.empty, "Erro: dados de candidatos estão vazios!"
-        assert not dados_bens.empty, "Erro: dados de bens estão vazios!"
-        assert not dados_info_complementar.empty, "Erro: dados de informações complementares são vazios!"
-        assert not dados_redes_sociais.empty, "Erro: dados de redes sociais estão vazios!"
-        assert not dados_coligacoes.empty, "Erro: dados de coligações estão vazios!"
-        assert not dados_motivo_cassacao.empty, "Erro: dados de motivos de cassação estão vazios!"
-        assert not dados_vagas.empty, "Erro: dados de vagas estão vazios!"
-    except AssertionError as e:
-        print(e)
-
-    municipios_coordenadas = pd.DataFrame({
+        fato = montar_fato_candidatos(dados_candidatos, dados_bens, dados_info_complementar)
+        base = fato[DIMENSOES_CUBO + ['TOTAL_BENS']].assign(NUM_COM_BENS=fato['NUM_BENS'] > 0)
+        base['ETNIA_INDIGENA'] = base['ETNIA_INDIGENA'].map({True: 'S', False: 'N'}).astype('category')
+        base['ST_QUILOMBOLA'] = base['ST_QUILOMBOLA'].map({True: 'S', False: 'N'}).astype('category')
+
+        cubo = base.groupby(DIMENSOES_CUBO, observed=True, dropna=False).agg(
+            NUM_CANDIDATOS=('TOTAL_BENS', 'size'),
+            NUM_COM_BENS=('NUM_COM_BENS', 'sum'),
+            TOTAL_BENS=('TOTAL_BENS', 'sum'),
+        ).reset_index()
+        for dimensao in DIMENSOES_CUBO:
+            cubo[dimensao] = cubo[dimensao].astype('category')
+
+        # Parquet com dimensões dicionarizadas
+        with etapa(f"escrita {CUBO_PATH}", "escrita", linhas=len(cubo)), escrita_atomica(CUBO_PATH) as temporario:
+            exibir(cubo).to_parquet(temporario, index=False)
+        print(f"Cubo com {len(cubo)} células salvo em '{CUBO_PATH}'")
+    except Exception as e:
+        print(f"Erro no insight 10 - cubo_candidatos: {e}")
+
+
+DATA_PATHS = {
+    "candidatos": "./data/candidatos/",
+    "candidatos_bens": "./data/candidatos_bens/",
+    "candidatos_info_complementar": "./data/candidatos_info_complementar/",
+    "candidatos_redes_sociais": "./data/candidatos_redes_sociais/",
+    "coligacoes": "./data/coligacoes/",
+    "motivo_cassacao": "./data/motivo_cassacao/",
+    "vagas": "./data/vagas/"
+}
+
+def capitais_coordenadas():
+    return pd.DataFrame({
         'MUNICIPIO': [
             'São Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Salvador', 'Fortaleza',
             'Brasília', 'Curitiba', 'Manaus', 'Recife', 'Porto Alegre',
@@ -404,41 +1770,637 @@ def main():
         ]
     })
 
-    # Executa o insight 1 diretamente
-    insight_1_economia_influencia_eleicao(dados_candidatos, dados_bens)
-    print("Insight 1 processado com sucesso.")
-
-    # Executa o insight 2 diretamente
-    insight_2_coligacoes_disputas_vitoria(dados_candidatos, dados_coligacoes)
-    print("Insight 2 processado com sucesso.")
-
-    # Executa o insight 3 diretamente
-    insight_3_maior_partido_uf(dados_candidatos)
-    print("Insight 3 processado com sucesso.")
+def carregar_coordenadas_municipios(caminho=MUNICIPIOS_PATH):
+    # Aceita a tabela com MUNICIPIO/SG_UF/LATITUDE/LONGITUDE ou o layout do IBGE
+    # (nome, codigo_uf, latitude, longitude); sem o arquivo, usa apenas as capitais
+    if not os.path.exists(caminho):
+        print(f"Arquivo '{caminho}' não encontrado; usando apenas as coordenadas das capitais.")
+        return capitais_coordenadas()
+    municipios = pd.read_csv(caminho, sep=None, engine='python', encoding='utf-8')
+    municipios = municipios.rename(columns=str.upper).rename(columns={'NOME': 'MUNICIPIO'})
+    if 'SG_UF' not in municipios.columns:
+        municipios['SG_UF'] = municipios['CODIGO_UF'].map(CODIGOS_IBGE_UF)
+    return municipios[['MUNICIPIO', 'SG_UF', 'LATITUDE', 'LONGITUDE']]
+
+# Entradas que não vêm das pastas de CSV
+CARREGADORES = {
+    "municipios": carregar_coordenadas_municipios,
+    "stop_words": ensure_stopwords,
+}
+
+# Cada insight declara as entradas que consome, na ordem dos seus argumentos, os arquivos de dados
+# que gera e os gráficos desenhados a partir deles (GRAFICOS). "varios_anos" marca os que têm a
+# dimensão ANO_ELEICAO nas saídas e por isso aceitam mais de uma eleição (conferir_anos)
+INSIGHTS = {
+    1: {
+        "funcao": insight_1_economia_influencia_eleicao,
+        "datasets": ["candidatos", "candidatos_bens"],
+        "saidas": ["output/total_bens_prefeitos_eleitos.csv"],
+        "graficos": ["total_bens_prefeitos_eleitos"],
+    },
+    2: {
+        "funcao": insight_2_coligacoes_disputas_vitoria,
+        "datasets": ["candidatos", "coligacoes"],
+        "saidas": ["output/coligacoes_detalhadas.csv"],
+        "graficos": ["coligacoes_eleitos"],
+    },
+    3: {
+        "funcao": insight_3_maior_partido_uf,
+        "datasets": ["candidatos"],
+        "saidas": ["output/maior_partido_por_uf.csv"],
+        "graficos": ["partido_maior_por_uf"],
+    },
+    4: {
+        "funcao": insight_4_tendencia_regional_partido,
+        "datasets": ["candidatos"],
+        "saidas": ["output/distribuicao_partido_regiao.csv"],
+        "graficos": ["distribuicao_partido_regiao"],
+    },
+    5: {
+        "funcao": insight_5_partido_dominante_cargo,
+        "datasets": ["candidatos"],
+        "saidas": ["output/partido_dominante_uf.csv"],
+        "graficos": ["partido_dominante_por_uf"],
+    },
+    6: {
+        "funcao": insight_6_candidatos_indigenas_quilombolas,
+        "datasets": ["candidatos_info_complementar"],
+        "saidas": ["output/indigenas_por_regiao.csv", "output/quilombolas_por_regiao.csv"],
+        "graficos": ["indigenas_quilombolas_regiao"],
+    },
+    7: {
+        "funcao": insight_7_rede_social_preferida,
+        "datasets": ["candidatos_redes_sociais"],
+        "saidas": ["output/redes_por_partido_uf.csv"],
+        "graficos": ["rede_social_uf"],
+    },
+    8: {
+        "funcao": insight_8_termos_propostas_governo,
+        "datasets": ["stop_words"],
+        "arquivos": [os.path.join(PATH_PROPOSTAS, "*", "*.pdf")],
+        "parametros": {"ufs": None, "chunksize": 8},
+        "saidas": ["output/termos_propostas.csv"],
+        "graficos": ["nuvem_termos_propostas"],
+    },
+    9: {
+        "funcao": insight_9_mapa_resultados_eleicao,
+        "datasets": ["candidatos", "municipios"],
+        "arquivos": [MUNICIPIOS_PATH],
+        "saidas": ["output/resultado_eleicoes_municipios.csv"],
+        "graficos": ["resultado_eleicoes_mapa"],
+    },
+    10: {
+        "funcao": insight_10_cubo_candidatos,
+        "datasets": ["candidatos", "candidatos_bens", "candidatos_info_complementar"],
+        "saidas": [CUBO_PATH],
+        "varios_anos": True,
+    },
+    11: {
+        "funcao": insight_11_fato_candidatos,
+        "datasets": [
+            "candidatos", "candidatos_bens", "candidatos_info_complementar", "candidatos_redes_sociais", "coligacoes"
+        ],
+        "saidas": [FATO_PATH],
+        "varios_anos": True,
+    },
+}
+
+# Insights que podem ser calculados bloco a bloco. Cada etapa lê um dataset e declara
+# (dataset, função parcial, função que combina parciais); a função parcial recebe o bloco
+# e os resultados das etapas anteriores, e finalizar recebe o resultado de todas as etapas
+STREAMING = {
+    1: {
+        "etapas": [
+            ("candidatos", parcial_1_prefeitos_eleitos, concat_frames),
+            ("candidatos_bens", parcial_1_bens_prefeitos, combinar_parciais),
+        ],
+        "finalizar": finalizar_1_economia_influencia_eleicao,
+    },
+    2: {
+        "etapas": [
+            ("candidatos", parcial_2_eleitos_coligacao, combinar_parciais),
+            ("coligacoes", parcial_2_coligacoes, concat_frames),
+        ],
+        "finalizar": finalizar_2_coligacoes_disputas_vitoria,
+    },
+    3: {
+        "etapas": [("candidatos", parcial_3_maior_partido_uf, combinar_parciais)],
+        "finalizar": finalizar_3_maior_partido_uf,
+    },
+    4: {
+        "etapas": [("candidatos", parcial_4_tendencia_regional_partido, combinar_parciais)],
+        "finalizar": finalizar_4_tendencia_regional_partido,
+    },
+    5: {
+        "etapas": [("candidatos", parcial_5_partido_dominante_cargo, combinar_parciais)],
+        "finalizar": finalizar_5_partido_dominante_cargo,
+    },
+    6: {
+        "etapas": [
+            ("candidatos_info_complementar", parcial_6_indigenas_regiao, combinar_parciais),
+            ("candidatos_info_complementar", parcial_6_quilombolas_regiao, combinar_parciais),
+        ],
+        "finalizar": finalizar_6_candidatos_indigenas_quilombolas,
+    },
+    7: {
+        "etapas": [("candidatos_redes_sociais", parcial_7_rede_social_preferida, combinar_parciais)],
+        "finalizar": finalizar_7_rede_social_preferida,
+    },
+}
+
+class DadosLazy:
+    # Carrega cada tabela na primeira vez que um insight a pede e a reaproveita depois
+
+    def __init__(self, insights, data_paths=DATA_PATHS, **opcoes_carga):
+        self.insights = insights
+        self.data_paths = data_paths
+        self.opcoes_carga = opcoes_carga
+        self.tabelas = {}
+
+    def carregar(self, dataset):
+        with etapa(f"carga {dataset}", "carga") as evento:
+            if dataset in CARREGADORES:
+                dados = CARREGADORES[dataset]()
+                evento["linhas"] = len(dados)
+                return dados
+            colunas = colunas_necessarias(dataset, self.insights) or None
+            df = load_data_from_folder(
+                self.data_paths[dataset], dataset=dataset, columns=colunas, **self.opcoes_carga
+            )
+            evento["linhas"] = len(df)
+        if df.empty:
+            print(f"Erro: dados de {dataset} estão vazios!")
+        return df
+
+    def __getitem__(self, dataset):
+        if dataset not in self.tabelas:
+            self.tabelas[dataset] = self.carregar(dataset)
+        return self.tabelas[dataset]
+
+
+def executar_streaming(insights, chunksize=None, data_paths=DATA_PATHS, **opcoes_carga):
+    # A cada rodada, lê uma vez cada dataset exigido pela próxima etapa de algum insight
+    # e alimenta todas as agregações parciais com o mesmo bloco
+    resultados = {numero: [] for numero in insights}
+    while True:
+        por_dataset = {}
+        for numero in insights:
+            etapas = STREAMING[numero]["etapas"]
+            if len(resultados[numero]) < len(etapas):
+                dataset = etapas[len(resultados[numero])][0]
+                por_dataset.setdefault(dataset, []).append(numero)
+        if not por_dataset:
+            break
+
+        for dataset, numeros in por_dataset.items():
+            acumulados = {numero: None for numero in numeros}
+            blocos = iterar_blocos(
+                data_paths[dataset], dataset, colunas_necessarias(dataset, numeros), chunksize, **opcoes_carga
+            )
+            with etapa(f"streaming {dataset} (insights {numeros})", "carga", linhas=0) as evento:
+                for bloco in blocos:
+                    evento["linhas"] += len(bloco)
+                    for numero in numeros:
+                        _, parcial, combinar = STREAMING[numero]["etapas"][len(resultados[numero])]
+                        resultado = parcial(bloco, *resultados[numero])
+                        acumulado = acumulados[numero]
+                        acumulados[numero] = resultado if acumulado is None else combinar([acumulado, resultado])
+            for numero in numeros:
+                if acumulados[numero] is None:
+                    print(f"Erro: dados de {dataset} estão vazios!")
+                    acumulados[numero] = pd.DataFrame(columns=colunas_necessarias(dataset, [numero]))
+                resultados[numero].append(acumulados[numero])
+
+    for numero in insights:
+        print(f"Insight {numero} (streaming)")
+        METRICAS.local.insight = numero
+        try:
+            with etapa(f"insight {numero}", "insight"):
+                STREAMING[numero]["finalizar"](*resultados[numero])
+            print(f"Insight {numero} processado com sucesso.")
+        except Exception as e:
+            print(f"Erro no insight {numero} (streaming): {e}")
+        finally:
+            METRICAS.local.insight = None
+
+
+def executar_duckdb(insights, jobs=None, data_paths=DATA_PATHS, **opcoes_carga):
+    # Executa as CONSULTAS no DuckDB, direto sobre os arquivos de cada dataset e em várias
+    # threads; só o resultado agregado de cada etapa volta para o pandas
+    conexao = duckdb.connect()
+    if jobs:
+        conexao.execute(f"SET threads = {int(jobs)}")
+    try:
+        with etapa("rotulos duckdb", "carga"):
+            rotulos_duckdb(insights, data_paths, **opcoes_carga)
+        for numero in insights:
+            print(f"Insight {numero} (duckdb)")
+            METRICAS.local.insight = numero
+            try:
+                with etapa(f"insight {numero}", "insight"):
+                    resultados = []
+                    for consulta in CONSULTAS[numero]:
+                        dataset = consulta["dataset"]
+                        fonte = fonte_duckdb(data_paths[dataset], dataset, colunas_consulta(consulta), **opcoes_carga)
+                        if fonte is None:
+                            print(f"Erro: dados de {dataset} estão vazios!")
+                            resultados.append(pd.DataFrame(columns=colunas_consulta(consulta)))
+                            continue
+                        with etapa(f"consulta duckdb {dataset}", "consulta") as evento:
+                            resultados.append(agregar_duckdb(consulta, conexao, fonte, *resultados))
+                            evento["linhas"] = len(resultados[-1])
+                    STREAMING[numero]["finalizar"](*resultados)
+                print(f"Insight {numero} processado com sucesso.")
+            except Exception as e:
+                print(f"Erro no insight {numero} (duckdb): {e}")
+            finally:
+                METRICAS.local.insight = None
+    finally:
+        conexao.close()
+
+
+def ordenar_linhas(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def comparar_engines(insights=None, jobs=None, particoes=None, jobs_carga=None):
+    # Gera as saídas com o pandas e depois com o DuckDB e confere se os CSVs têm o mesmo
+    # conteúdo (a ordem das linhas e o último dígito dos valores somados podem variar)
+    insights = [numero for numero in (insights or list(CONSULTAS)) if numero in CONSULTAS]
+    conferir_anos(insights, particoes)
+    saidas = [saida for numero in insights for saida in INSIGHTS[numero]["saidas"] if saida.endswith(".csv")]
+
+    # Só os dados são comparados: os gráficos não são desenhados. As saídas atuais são guardadas
+    # à parte e devolvidas no fim, então a comparação não troca os CSVs da última execução
+    renderizar.iniciar(ativo=False)
+    with tempfile.TemporaryDirectory(prefix="comparacao_", dir="output", ignore_cleanup_errors=True) as reserva:
+        copias = {}
+        for indice, saida in enumerate(saidas):
+            if os.path.exists(saida):
+                copias[saida] = os.path.join(reserva, f"{indice}.csv")
+                os.replace(saida, copias[saida])
+        try:
+            pool_carga.iniciar(jobs_carga)
+            try:
+                agendar_insights(insights, DadosLazy(insights, particoes=particoes), jobs)
+            finally:
+                pool_carga.concluir()
+            esperados = {saida: pd.read_csv(saida) for saida in saidas if os.path.exists(saida)}
+            for saida in esperados:
+                os.remove(saida)
+            executar_duckdb(insights, jobs, particoes=particoes)
+            obtidos = {saida: pd.read_csv(saida) for saida in saidas if os.path.exists(saida)}
+        finally:
+            for saida in saidas:
+                if saida in copias:
+                    os.replace(copias[saida], saida)
+                elif os.path.exists(saida):
+                    os.remove(saida)
+
+    divergentes = [saida for saida in saidas if saida not in esperados or saida not in obtidos]
+    for saida, esperado in esperados.items():
+        if saida in divergentes:
+            continue
+        try:
+            pd.testing.assert_frame_equal(
+                ordenar_linhas(obtidos[saida]), ordenar_linhas(esperado), check_dtype=False, rtol=1e-9
+            )
+        except AssertionError as e:
+            print(f"'{saida}' difere entre as engines:\n{e}")
+            divergentes.append(saida)
+
+    if divergentes:
+        print(f"Engines divergem em: {divergentes}")
+    else:
+        print(f"As duas engines geraram os mesmos CSVs ({len(saidas)} arquivos).")
+    return not divergentes
+
+
+def ler_manifesto(caminho=MANIFESTO_PATH):
+    try:
+        with open(caminho, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {"arquivos": {}, "insights": {}}
+
+
+def salvar_manifesto(manifesto, caminho=MANIFESTO_PATH):
+    with escrita_atomica(caminho) as temporario, open(temporario, "w", encoding="utf-8") as file:
+        json.dump(manifesto, file, indent=2, sort_keys=True)
+
+
+def hash_arquivo(file, manifesto):
+    # Reaproveita o hash já calculado enquanto tamanho e mtime não mudarem
+    stat = os.stat(file)
+    registro = manifesto["arquivos"].get(file)
+    if registro and registro["tamanho"] == stat.st_size and registro["mtime"] == stat.st_mtime_ns:
+        return registro["sha256"]
+    sha256 = sha256_arquivo(file)
+    manifesto["arquivos"][file] = {"tamanho": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": sha256}
+    return sha256
+
+
+def arquivos_entrada(numero, particoes=None):
+    arquivos = [
+        file for dataset in INSIGHTS[numero]["datasets"] if dataset in DATA_PATHS
+        for file in listar_arquivos(DATA_PATHS[dataset], particoes=particoes)
+    ]
+    arquivos += [file for padrao in INSIGHTS[numero].get("arquivos", []) for file in glob(padrao)]
+    return sorted(arquivos)
+
+
+def impressao_insight(numero, manifesto, particoes=None):
+    # Combina o conteúdo das entradas, os parâmetros e o código do insight
+    insight = INSIGHTS[numero]
+    impressao = hashlib.sha256()
+    for file in arquivos_entrada(numero, particoes):
+        impressao.update(f"{file}:{hash_arquivo(file, manifesto)}\n".encode("utf-8"))
+    parametros = {
+        "datasets": insight["datasets"],
+        "colunas": COLUNAS_INSIGHTS[numero],
+        "esquemas": {dataset: ESQUEMAS[dataset] for dataset in insight["datasets"] if dataset in ESQUEMAS},
+        "saidas": insight["saidas"],
+        "graficos": {nome: GRAFICOS[nome] for nome in insight.get("graficos", [])},
+        "parametros": insight.get("parametros", {}),
+        "consultas": CONSULTAS.get(numero, []),
+        "derivadas": COLUNAS_DERIVADAS,
+        "canonicas": COLUNAS_CANONICAS,
+        "dominios": DOMINIOS,
+        "particoes": particoes,
+    }
+    impressao.update(json.dumps(parametros, sort_keys=True).encode("utf-8"))
+    # O código do módulo inteiro: as saídas dependem também da carga, da canonização, das
+    # junções e da escrita, e uma lista de funções escolhidas à mão sempre deixa alguma de fora
+    impressao.update(inspect.getsource(sys.modules[__name__]).encode("utf-8"))
+    return impressao.hexdigest()
+
+
+def arquivos_graficos(numero, specs=False):
+    arquivos = []
+    for nome in INSIGHTS[numero].get("graficos", []):
+        arquivos.append(caminho_grafico(nome))
+        if specs and GRAFICOS[nome].get("tipo") != "mapa":
+            arquivos.append(caminho_spec(nome))
+    return arquivos
+
+
+def saidas_atualizadas(numero, impressao, manifesto, graficos=()):
+    # Uma execução sem gráficos não atende a uma que pede gráficos
+    registro = manifesto["insights"].get(str(numero))
+    return (
+        registro is not None and registro["impressao"] == impressao and
+        set(graficos).issubset(registro.get("graficos", [])) and
+        all(os.path.exists(saida) for saida in INSIGHTS[numero]["saidas"] + list(graficos))
+    )
+
+
+def registrar_execucao(numero, impressao, manifesto, inicio, graficos=()):
+    # Os insights tratam os próprios erros; só registra se todas as saídas foram regravadas
+    saidas = INSIGHTS[numero]["saidas"]
+    if all(os.path.exists(saida) and os.path.getmtime(saida) >= inicio for saida in saidas + list(graficos)):
+        manifesto["insights"][str(numero)] = {"impressao": impressao, "saidas": saidas, "graficos": list(graficos)}
+    else:
+        manifesto["insights"].pop(str(numero), None)
+
+
+def executar_insight(numero, dados):
+    insight = INSIGHTS[numero]
+    entradas = [dados[dataset] for dataset in insight["datasets"]]
+    tabelas = [entrada for entrada in entradas if isinstance(entrada, pd.DataFrame)]
+    linhas = sum(len(tabela) for tabela in tabelas) if tabelas else None
+    METRICAS.local.insight = numero
+    try:
+        with etapa(f"insight {numero}", "insight", linhas=linhas):
+            insight["funcao"](*entradas, **insight.get("parametros", {}))
+    finally:
+        METRICAS.local.insight = None
+    print(f"Insight {numero} processado com sucesso.")
+
+
+def agendar_insights(insights, dados, jobs=None):
+    # Grafo de tarefas: cada dataset é carregado uma vez e cada insight
+    # é disparado assim que todas as suas entradas estiverem prontas
+    necessarios = {dataset for numero in insights for dataset in INSIGHTS[numero]["datasets"]}
+    pendentes = list(insights)
+    prontos = set()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        cargas = {executor.submit(dados.__getitem__, dataset): dataset for dataset in necessarios}
+        execucoes = {}
+
+        while pendentes or cargas or execucoes:
+            for numero in [n for n in pendentes if prontos.issuperset(INSIGHTS[n]["datasets"])]:
+                pendentes.remove(numero)
+                execucoes[executor.submit(executar_insight, numero, dados)] = numero
+
+            concluidos, _ = wait(list(cargas) + list(execucoes), return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                if futuro in cargas:
+                    prontos.add(cargas.pop(futuro))
+                else:
+                    execucoes.pop(futuro)
+                futuro.result()
+
+
+def particoes_execucao(anos=None, ufs=None, data_paths=DATA_PATHS):
+    # Sem anos, vale a eleição mais recente encontrada, para que as saídas não misturem eleições
+    if not anos:
+        encontrados = {
+            particao_arquivo(file).get("ANO_ELEICAO") for pasta in data_paths.values() for file in listar_arquivos(pasta)
+        }
+        encontrados.discard(None)
+        anos = [max(encontrados)] if encontrados else None
+    particoes = {"ANO_ELEICAO": anos, "SG_UF": ufs}
+    return {chave: valores for chave, valores in particoes.items() if valores} or None
+
+
+def conferir_anos(insights, particoes):
+    # Os CSVs dos insights sem a dimensão ANO_ELEICAO somariam eleições diferentes
+    anos = set((particoes or {}).get("ANO_ELEICAO") or [])
+    sem_ano = [numero for numero in insights if not INSIGHTS[numero].get("varios_anos")]
+    if len(anos) > 1 and sem_ano:
+        com_ano = ",".join(str(numero) for numero in INSIGHTS if INSIGHTS[numero].get("varios_anos"))
+        raise ValueError(
+            f"Os insights {sem_ano} não separam as eleições por ano; use --anos com um único ano "
+            f"ou --insights {com_ano}"
+        )
 
-    # Executa o insight 4 diretamente
-    insight_4_tendencia_regional_partido(dados_candidatos)
-    print("Insight 4 processado com sucesso.")
 
-    # Executa o insight 5 diretamente
-    insight_5_partido_dominante_cargo(dados_candidatos)
-    print("Insight 5 processado com sucesso.")
+def parse_lista_anos(valor):
+    try:
+        return [int(ano) for ano in valor.split(",") if ano.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Lista de anos inválida: '{valor}'")
 
-    # Executa o insight 6 diretamente
-    insight_6_candidatos_indigenas_quilombolas(dados_candidatos, dados_info_complementar)
-    print("Insight 6 processado com sucesso.")
 
-    # Executa o insight 7 diretamente
-    insight_7_rede_social_preferida(dados_redes_sociais)
-    print("Insight 7 processado com sucesso.")
+def inteiro_minimo(minimo):
+    def converter(valor):
+        try:
+            numero = int(valor)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Número inválido: '{valor}'")
+        if numero < minimo:
+            raise argparse.ArgumentTypeError(f"O valor deve ser pelo menos {minimo}: {numero}")
+        return numero
+    return converter
 
-    # Executa o insight 8 diretamente
-    insight_8_termos_propostas_governo(dados_candidatos)
-    print("Insight 8 processado com sucesso.")
 
-    # Executa o insight 9 diretamente
-    insight_9_mapa_resultados_eleicao(dados_candidatos, municipios_coordenadas)
-    print("Insight 9 processado com sucesso.")
+def parse_insights(valor):
+    try:
+        insights = [int(numero) for numero in valor.split(",") if numero.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Lista de insights inválida: '{valor}'")
+    invalidos = [numero for numero in insights if numero not in INSIGHTS]
+    if invalidos:
+        raise argparse.ArgumentTypeError(f"Insights inexistentes: {invalidos}")
+    return insights
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Análise das eleições municipais de 2024")
+    parser.add_argument(
+        "--insights", type=parse_insights, default=None,
+        help="Insights a executar, separados por vírgula (ex.: 1,3,7). Padrão: todos"
+    )
+    parser.add_argument(
+        "--jobs", type=inteiro_minimo(1), default=os.cpu_count(),
+        help="Número de tarefas executadas em paralelo"
+    )
+    parser.add_argument(
+        "--jobs-carga", type=inteiro_minimo(1), default=None,
+        help="Processos que convertem os CSVs e extraem os PDFs, somados todos os datasets. Padrão: um por CPU"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Regera as saídas mesmo que entradas, parâmetros e código não tenham mudado"
+    )
+    parser.add_argument(
+        "--anos", type=parse_lista_anos, default=None,
+        help="Eleições analisadas, separadas por vírgula (ex.: 2020,2024). Padrão: a mais recente encontrada. "
+             "Mais de uma só com os insights 10 e 11, que separam as eleições por ANO_ELEICAO"
+    )
+    parser.add_argument(
+        "--ufs", type=lambda valor: [uf.strip().upper() for uf in valor.split(",") if uf.strip()], default=None,
+        help="UFs analisadas (ex.: SC,PR); só as partições dessas UFs são lidas. Padrão: todas"
+    )
+    parser.add_argument(
+        "--ufs-propostas", type=lambda valor: [uf.strip().upper() for uf in valor.split(",") if uf.strip()],
+        default=None,
+        help="UFs cujas propostas de governo entram no insight 8 (ex.: SC,PR). Padrão: as de --ufs, ou todas"
+    )
+    parser.add_argument(
+        "--chunksize-propostas", type=inteiro_minimo(1), default=8,
+        help="Número de PDFs processados por tarefa no insight 8"
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="Calcula os insights 1 a 7 por agregações parciais, um arquivo (ou bloco) por vez"
+    )
+    parser.add_argument(
+        "--chunksize", type=inteiro_minimo(1), default=None,
+        help="No modo streaming, número máximo de linhas por bloco. Padrão: um arquivo por vez"
+    )
+    parser.add_argument(
+        "--engine", choices=["pandas", "duckdb"], default="pandas",
+        help="Engine que executa as agregações dos insights 1 a 7"
+    )
+    parser.add_argument(
+        "--comparar-engines", action="store_true",
+        help="Executa os insights com as duas engines e confere se os CSVs gerados são iguais"
+    )
+    parser.add_argument(
+        "--sem-graficos", dest="graficos", action="store_false",
+        help="Gera apenas os arquivos de dados (CSV e Parquet), sem desenhar os gráficos"
+    )
+    parser.add_argument(
+        "--specs-vega", action="store_true",
+        help="Grava também a especificação Vega-Lite de cada gráfico em output/graficos/, usada pelo dashboard"
+    )
+    parser.add_argument(
+        "--jobs-graficos", type=inteiro_minimo(0), default=2,
+        help="Processos que desenham os gráficos em paralelo com os insights (0 desenha na thread do insight)"
+    )
+    parser.add_argument(
+        "--metricas", default=None,
+        help="Grava as métricas de cada etapa neste arquivo JSON (formato trace-event do Chrome)"
+    )
+    parser.add_argument(
+        "--cprofile", default=None,
+        help="Grava neste arquivo o perfil do cProfile das cargas e dos insights (abrir com pstats ou snakeviz)"
+    )
+    args = parser.parse_args(argv)
+    insights = [numero for numero in args.insights or INSIGHTS if not args.comparar_engines or numero in CONSULTAS]
+    try:
+        conferir_anos(insights, {"ANO_ELEICAO": args.anos})
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(insights=None, jobs=None, force=False, streaming=False, chunksize=None,
+         ufs_propostas=None, chunksize_propostas=8, engine="pandas", metricas=None, cprofile=None,
+         graficos=True, specs_vega=False, jobs_graficos=2, jobs_carga=None, anos=None, ufs=None):
+    # Sem --anos vale uma única eleição (particoes_execucao); a conferência vem antes dos pools
+    conferir_anos(insights or list(INSIGHTS), {"ANO_ELEICAO": anos})
+    # O pool de renderização é criado antes das threads de carga e dos pools dos insights
+    renderizar.iniciar(graficos, specs_vega, jobs_graficos)
+    METRICAS.iniciar(perfilar=cprofile is not None)
+    insights = insights or list(INSIGHTS)
+    arquivos = {numero: arquivos_graficos(numero, specs_vega) if graficos else [] for numero in insights}
+    INSIGHTS[8]["parametros"] = {"ufs": ufs_propostas or ufs, "chunksize": chunksize_propostas}
+    particoes = particoes_execucao(anos, ufs)
+    manifesto = ler_manifesto()
+    impressoes = {numero: impressao_insight(numero, manifesto, particoes) for numero in insights}
+
+    a_executar = []
+    for numero in insights:
+        if not force and saidas_atualizadas(numero, impressoes[numero], manifesto, arquivos[numero]):
+            print(f"Insight {numero} sem alterações nas entradas; saídas mantidas.")
+        else:
+            a_executar.append(numero)
+
+    if a_executar:
+        inicio = time.time()
+        em_duckdb = [numero for numero in a_executar if engine == "duckdb" and numero in CONSULTAS]
+        em_streaming = [
+            numero for numero in a_executar if streaming and numero in STREAMING and numero not in em_duckdb
+        ]
+        em_memoria = [numero for numero in a_executar if numero not in em_streaming + em_duckdb]
+        try:
+            if em_memoria:
+                # Também antes das threads de carga, pelo mesmo motivo do pool de renderização
+                pool_carga.iniciar(jobs_carga)
+                agendar_insights(em_memoria, DadosLazy(em_memoria, particoes=particoes), jobs)
+            if em_streaming:
+                executar_streaming(em_streaming, chunksize, particoes=particoes)
+            if em_duckdb:
+                executar_duckdb(em_duckdb, jobs, particoes=particoes)
+        finally:
+            pool_carga.concluir()
+            renderizar.concluir()
+        for numero in a_executar:
+            registrar_execucao(numero, impressoes[numero], manifesto, inicio, arquivos[numero])
+    else:
+        renderizar.concluir()
+
+    salvar_manifesto(manifesto)
+
+    METRICAS.resumo()
+    if metricas:
+        METRICAS.salvar_trace(metricas)
+        print(f"Métricas salvas em '{metricas}'")
+    if cprofile:
+        METRICAS.salvar_perfil(cprofile)
+        print(f"Perfil do cProfile salvo em '{cprofile}'")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.comparar_engines:
+        raise SystemExit(0 if comparar_engines(
+            args.insights, args.jobs, particoes_execucao(args.anos, args.ufs), args.jobs_carga
+        ) else 1)
+    main(
+        args.insights, args.jobs, args.force, args.streaming, args.chunksize,
+        args.ufs_propostas, args.chunksize_propostas, args.engine, args.metricas, args.cprofile,
+        args.graficos, args.specs_vega, args.jobs_graficos, args.jobs_carga, args.anos, args.ufs
+    )
\ No newline at end of file
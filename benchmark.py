@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+from glob import glob
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows: sem getrusage, o pico de memória não é medido
+    resource = None
+
+# Mede a carga de cada dataset (CSV e cache Parquet), cada insight e, opcionalmente, a engine
+# DuckDB sobre uma pasta de dados (reais ou gerados por gerar_dados_sinteticos.py). Cada medida
+# roda num processo novo, para que o pico de memória seja só daquela medida. Os resultados ficam
+# em .benchmarks/ e são comparados com a última execução sobre os mesmos dados.
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTADOS_DIR = os.path.join(REPO_DIR, ".benchmarks")
+DADOS_PADRAO = os.path.join(RESULTADOS_DIR, "dados")
+MARCADOR = "RESULTADO_BENCHMARK "
+
+
+def pico_rss_mb():
+    # ru_maxrss vem em KB no Linux e em bytes no macOS; RUSAGE_CHILDREN cobre os workers já encerrados
+    if resource is None:
+        return None, None
+    fator = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (
+        round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / fator, 1),
+        round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / fator, 1),
+    )
+
+
+def medir(nome, repeticoes):
+    # Executado no processo filho, com a pasta de dados como diretório de trabalho
+    sys.path.insert(0, REPO_DIR)
+    import analise_eleitoral as ae
+
+    tipo, alvo = nome.split(":")
+    if tipo in ("carga_csv", "carga_cache"):
+        usar_cache = tipo == "carga_cache"
+        colunas = ae.colunas_necessarias(alvo, list(ae.INSIGHTS)) or None
+        executar = lambda: ae.load_data_from_folder(
+            ae.DATA_PATHS[alvo], use_cache=usar_cache, dataset=alvo, columns=colunas
+        )
+        if usar_cache:
+            # Aquece o cache Parquet; só as leituras seguintes são medidas
+            executar()
+    elif tipo == "insight":
+        numero = int(alvo)
+        dados = ae.DadosLazy([numero])
+        for dataset in ae.INSIGHTS[numero]["datasets"]:
+            dados[dataset]
+        executar = lambda: ae.executar_insight(numero, dados)
+    elif tipo == "duckdb":
+        executar = lambda: ae.executar_duckdb([int(alvo)])
+    else:
+        raise ValueError(f"Benchmark desconhecido: '{nome}'")
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar()
+        tempos.append(round(time.perf_counter() - inicio, 4))
+    pico_rss, pico_rss_workers = pico_rss_mb()
+    return {
+        "nome": nome,
+        "tempo_min_s": min(tempos),
+        "tempo_mediana_s": sorted(tempos)[len(tempos) // 2],
+        "tempos_s": tempos,
+        "pico_rss_mb": pico_rss,
+        "pico_rss_workers_mb": pico_rss_workers,
+    }
+
+
+def listar_benchmarks(insights, duckdb=False):
+    sys.path.insert(0, REPO_DIR)
+    from analise_eleitoral import INSIGHTS, DATA_PATHS, CONSULTAS
+
+    datasets = sorted({dataset for numero in insights for dataset in INSIGHTS[numero]["datasets"] if dataset in DATA_PATHS})
+    nomes = [f"carga_csv:{dataset}" for dataset in datasets]
+    nomes += [f"carga_cache:{dataset}" for dataset in datasets]
+    nomes += [f"insight:{numero}" for numero in insights]
+    if duckdb:
+        nomes += [f"duckdb:{numero}" for numero in insights if numero in CONSULTAS]
+    return nomes
+
+
+def executar_benchmarks(pasta_dados, nomes, repeticoes):
+    resultados = {}
+    for nome in nomes:
+        processo = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--medir", nome, "--repeticoes", str(repeticoes)],
+            cwd=pasta_dados, capture_output=True, text=True
+        )
+        linhas = [linha for linha in processo.stdout.splitlines() if linha.startswith(MARCADOR)]
+        if processo.returncode != 0 or not linhas:
+            print(f"Erro no benchmark {nome}:\n{processo.stderr[-2000:]}")
+            continue
+        resultado = json.loads(linhas[-1][len(MARCADOR):])
+        resultados[nome] = resultado
+        print(f"{nome:<42} {resultado['tempo_min_s']:>9.3f} s {resultado['pico_rss_mb'] or 0:>9.1f} MB")
+    return resultados
+
+
+def resumo_dados(pasta_dados):
+    # Tamanho de cada pasta de dados: identifica a escala e evita comparar execuções com dados diferentes
+    resumo = {}
+    for pasta in sorted(glob(os.path.join(pasta_dados, "data", "*"))):
+        arquivos = [file for file in glob(os.path.join(pasta, "**", "*"), recursive=True) if os.path.isfile(file)]
+        resumo[os.path.basename(pasta)] = {"arquivos": len(arquivos), "bytes": sum(os.path.getsize(file) for file in arquivos)}
+    return resumo
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def salvar_resultados(registro):
+    os.makedirs(RESULTADOS_DIR, exist_ok=True)
+    caminho = os.path.join(RESULTADOS_DIR, f"{registro['data'].replace(':', '')}_{registro['commit'] or 'sem-commit'}.json")
+    with open(caminho, "w", encoding="utf-8") as file:
+        json.dump(registro, file, indent=2, ensure_ascii=False)
+    return caminho
+
+
+def ultima_referencia(registro):
+    # Última execução anterior sobre os mesmos dados
+    for caminho in sorted(glob(os.path.join(RESULTADOS_DIR, "*.json")), reverse=True):
+        with open(caminho, "r", encoding="utf-8") as file:
+            anterior = json.load(file)
+        if anterior["dados"] == registro["dados"] and anterior["data"] != registro["data"]:
+            return anterior
+    return None
+
+
+def comparar(registro, referencia, limiar):
+    regressoes = []
+    for nome, resultado in registro["resultados"].items():
+        anterior = referencia["resultados"].get(nome)
+        if anterior is None:
+            continue
+        for metrica in ("tempo_min_s", "pico_rss_mb"):
+            if anterior.get(metrica) and resultado.get(metrica) and resultado[metrica] > anterior[metrica] * limiar:
+                regressoes.append(f"{nome}: {metrica} {anterior[metrica]} -> {resultado[metrica]}")
+    return regressoes
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de carga e dos insights")
+    parser.add_argument("pasta_dados", nargs="?", default=DADOS_PADRAO, help="Pasta que contém data/")
+    parser.add_argument("--gerar", action="store_true", help="Gera dados sintéticos na pasta antes de medir")
+    parser.add_argument("--escala", type=float, default=0.1, help="Escala dos dados gerados (1 = volume nacional)")
+    parser.add_argument(
+        "--ufs", type=lambda valor: [uf.strip().upper() for uf in valor.split(",") if uf.strip()], default=None,
+        help="UFs dos dados gerados (ex.: SP,MG). Padrão: todas"
+    )
+    parser.add_argument(
+        "--insights", type=lambda valor: [int(numero) for numero in valor.split(",") if numero.strip()],
+        default=None, help="Insights medidos, separados por vírgula. Padrão: todos"
+    )
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções de cada medida; vale a menor")
+    parser.add_argument("--duckdb", action="store_true", help="Mede também a engine DuckDB")
+    parser.add_argument("--referencia", default=None, help="Arquivo de resultados usado na comparação")
+    parser.add_argument("--limiar", type=float, default=1.2, help="Razão acima da qual uma medida é regressão")
+    parser.add_argument("--medir", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.medir:
+        print(MARCADOR + json.dumps(medir(args.medir, args.repeticoes)))
+        return 0
+
+    pasta_dados = os.path.abspath(args.pasta_dados)
+    if args.gerar or not os.path.isdir(os.path.join(pasta_dados, "data")):
+        from gerar_dados_sinteticos import gerar
+        gerar(pasta_dados, args.ufs, args.escala)
+
+    from analise_eleitoral import INSIGHTS
+    nomes = listar_benchmarks(args.insights or list(INSIGHTS), args.duckdb)
+    print(f"{'benchmark':<42} {'tempo':>11} {'pico RSS':>12}")
+    registro = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "maquina": {"python": platform.python_version(), "sistema": platform.platform(), "cpus": os.cpu_count()},
+        "dados": resumo_dados(pasta_dados),
+        "repeticoes": args.repeticoes,
+        "resultados": executar_benchmarks(pasta_dados, nomes, args.repeticoes),
+    }
+    print(f"Resultados salvos em '{salvar_resultados(registro)}'")
+
+    if args.referencia:
+        with open(args.referencia, "r", encoding="utf-8") as file:
+            referencia = json.load(file)
+    else:
+        referencia = ultima_referencia(registro)
+    if referencia is None:
+        print("Nenhuma execução anterior com os mesmos dados para comparar.")
+        return 0
+    regressoes = comparar(registro, referencia, args.limiar)
+    for regressao in regressoes:
+        print(f"Regressão: {regressao}")
+    if not regressoes:
+        print(f"Sem regressões em relação a {referencia['commit']} ({referencia['data']}).")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,78 +3,221 @@
 import streamlit as st
 import pandas as pd
 import os
+import json
 
-mapa_path = os.path.abspath("resultado_eleicoes_mapa.html")
+output_path = "output/"
+
+# Dimensões do cubo gerado pelo insight 10 do analise_eleitoral.py
+DIMENSOES_CUBO = {
+    "ANO_ELEICAO": "Ano",
+    "SG_UF": "UF",
+    "REGIAO": "Região",
+    "DS_CARGO": "Cargo",
+    "SG_PARTIDO": "Partido",
+    "DS_SIT_TOT_TURNO": "Situação",
+    "ETNIA_INDIGENA": "Indígena",
+    "ST_QUILOMBOLA": "Quilombola",
+}
 
 st.title("Dashboard de Análise das Eleições Municipais 2024")
 st.write("Este dashboard apresenta uma análise dos dados das eleições municipais de 2024, "
          "incluindo insights sobre poder econômico, coligações, redes sociais e propostas de governo.")
 
-output_path = "output/"
 
-# Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos
-st.subheader("Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos")
-st.image(output_path + "total_bens_prefeitos_eleitos.png", caption="Média de Bens Declarados pelos Prefeitos Eleitos e Não Eleitos")
-
-# Insight 2: Coligações com Maior Número de Eleitos
-st.subheader("Insight 2: Coligações com Maior Número de Eleitos")
-st.image(output_path + "coligacoes_eleitos.png", caption="Número de Eleitos por Coligação x Número de Partidos")
-
-# Insight 3: Partido com Maior Quantidade de Candidatos por UF
-st.subheader("Insight 3: Partido com Maior Quantidade de Candidatos por UF")
-st.image(output_path + "partido_maior_por_uf.png", caption="Partido com Maior Quantidade de Candidatos por UF")
-st.write("Dados:")
-maior_partido_por_uf = pd.read_csv(output_path + "maior_partido_por_uf.csv")
-st.dataframe(maior_partido_por_uf)
-
-# Insight 4: Tendência Regional para Candidaturas por Partido
-st.subheader("Insight 4: Tendência Regional para Candidaturas por Partido")
-st.image(output_path + "distribuicao_partido_regiao.png", caption="Distribuição de Candidaturas por Partido e Região")
-st.write("Dados:")
-candidatos_por_regiao = pd.read_csv(output_path + "distribuicao_partido_regiao.csv")
-st.dataframe(candidatos_por_regiao)
-
-# Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)
-st.subheader("Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)")
-st.image(output_path + "partido_dominante_por_uf.png", caption="Partido Dominante por UF")
-st.write("Dados:")
-partido_dominante_uf = pd.read_csv(output_path + "partido_dominante_uf.csv")
-st.dataframe(partido_dominante_uf)
-
-# Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região
-st.subheader("Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região")
-st.image(output_path + "indigenas_quilombolas_regiao.png", caption="Número de Candidatos Indígenas e Quilombolas por Região")
-st.write("Dados:")
-indigenas_por_regiao = pd.read_csv(output_path + "indigenas_por_regiao.csv")
-quilombolas_por_regiao = pd.read_csv(output_path + "quilombolas_por_regiao.csv")
-st.write("Candidatos Indígenas por Região:")
-st.dataframe(indigenas_por_regiao)
-st.write("Candidatos Quilombolas por Região:")
-st.dataframe(quilombolas_por_regiao)
-
-# Insight 7: Rede Social Preferida dos Candidatos por Partido e UF
-st.subheader("Insight 7: Rede Social Preferida dos Candidatos por Partido e UF")
-st.image(output_path + "rede_social_uf.png", caption="Rede Social Preferida por UF")
-st.write("Dados:")
-redes_por_partido_uf = pd.read_csv(output_path + "redes_por_partido_uf.csv")
-st.dataframe(redes_por_partido_uf)
-
-# Insight 8: Principais Termos nas Propostas de Governo
-st.subheader("Insight 8: Principais Termos nas Propostas de Governo")
-st.image(output_path + "nuvem_termos_propostas.png", caption="Nuvem de Palavras das Propostas de Governo")
-st.write("Dados:")
-termos_propostas = pd.read_csv(output_path + "termos_propostas.csv")
-st.dataframe(termos_propostas)
-
-# Insight 9: Mapeamento do Resultado das Eleições com Folium
-st.subheader("Insight 9: Mapeamento do Resultado das Eleições com Folium")
-st.write("Clique no link abaixo para visualizar o mapa dos resultados das eleições:")
-
-with open("output/resultado_eleicoes_mapa.html", "r", encoding="utf-8") as file:
-    mapa_html = file.read()
-
-st.components.v1.html(mapa_html, height=600, scrolling=True)
-
-st.write("Este mapa interativo exibe o partido vencedor em cada município, colorido de acordo com a legenda.")
+# Os artefatos são lidos uma vez e guardados em cache; o mtime faz parte da chave,
+# então um arquivo regerado pelo analise_eleitoral.py é relido automaticamente
+
+def mtime(caminho):
+    return os.path.getmtime(caminho) if os.path.exists(caminho) else None
+
+@st.cache_data(show_spinner=False)
+def ler_csv(caminho, mtime):
+    return pd.read_csv(caminho)
+
+@st.cache_data(show_spinner=False)
+def ler_parquet(caminho, mtime):
+    return pd.read_parquet(caminho)
+
+@st.cache_data(show_spinner=False)
+def ler_bytes(caminho, mtime):
+    with open(caminho, "rb") as file:
+        return file.read()
+
+@st.cache_data(show_spinner=False)
+def ler_texto(caminho, mtime):
+    with open(caminho, "r", encoding="utf-8") as file:
+        return file.read()
+
+def mostrar_imagem(arquivo, caption):
+    caminho = output_path + arquivo
+    if mtime(caminho) is None:
+        st.warning(f"Arquivo '{caminho}' não encontrado. Execute o analise_eleitoral.py.")
+        return
+    st.image(ler_bytes(caminho, mtime(caminho)), caption=caption)
+
+def mostrar_grafico(nome, caption):
+    # Com a especificação Vega-Lite (analise_eleitoral.py --specs-vega), o gráfico é desenhado
+    # no navegador e fica interativo; sem ela, ou se o PNG for mais novo, mostra o PNG
+    spec_path = output_path + "graficos/" + nome + ".vl.json"
+    png_path = output_path + nome + ".png"
+    if mtime(spec_path) is None or (mtime(png_path) or 0) > mtime(spec_path):
+        mostrar_imagem(nome + ".png", caption)
+        return
+    st.vega_lite_chart(json.loads(ler_texto(spec_path, mtime(spec_path))), width="stretch")
+    st.caption(caption)
+
+def mostrar_tabela(arquivo):
+    caminho = output_path + arquivo
+    if mtime(caminho) is None:
+        st.warning(f"Arquivo '{caminho}' não encontrado. Execute o analise_eleitoral.py.")
+        return
+    st.dataframe(ler_csv(caminho, mtime(caminho)))
+
+
+# Cada seção só lê seus arquivos quando é escolhida no menu lateral
+
+def insight_1():
+    # Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos
+    st.subheader("Insight 1: Média de Bens Declarados - Prefeitos Eleitos vs Não Eleitos")
+    mostrar_grafico("total_bens_prefeitos_eleitos", "Média de Bens Declarados pelos Prefeitos Eleitos e Não Eleitos")
+
+def insight_2():
+    # Insight 2: Coligações com Maior Número de Eleitos
+    st.subheader("Insight 2: Coligações com Maior Número de Eleitos")
+    mostrar_grafico("coligacoes_eleitos", "Número de Eleitos por Coligação x Número de Partidos")
+
+def insight_3():
+    # Insight 3: Partido com Maior Quantidade de Candidatos por UF
+    st.subheader("Insight 3: Partido com Maior Quantidade de Candidatos por UF")
+    mostrar_grafico("partido_maior_por_uf", "Partido com Maior Quantidade de Candidatos por UF")
+    st.write("Dados:")
+    mostrar_tabela("maior_partido_por_uf.csv")
+
+def insight_4():
+    # Insight 4: Tendência Regional para Candidaturas por Partido
+    st.subheader("Insight 4: Tendência Regional para Candidaturas por Partido")
+    mostrar_grafico("distribuicao_partido_regiao", "Distribuição de Candidaturas por Partido e Região")
+    st.write("Dados:")
+    mostrar_tabela("distribuicao_partido_regiao.csv")
+
+def insight_5():
+    # Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)
+    st.subheader("Insight 5: Partido Dominante por UF (Prefeito, Vice e Vereadores)")
+    mostrar_grafico("partido_dominante_por_uf", "Partido Dominante por UF")
+    st.write("Dados:")
+    mostrar_tabela("partido_dominante_uf.csv")
+
+def insight_6():
+    # Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região
+    st.subheader("Insight 6: Distribuição de Candidatos Indígenas e Quilombolas por Região")
+    mostrar_grafico("indigenas_quilombolas_regiao", "Número de Candidatos Indígenas e Quilombolas por Região")
+    st.write("Dados:")
+    st.write("Candidatos Indígenas por Região:")
+    mostrar_tabela("indigenas_por_regiao.csv")
+    st.write("Candidatos Quilombolas por Região:")
+    mostrar_tabela("quilombolas_por_regiao.csv")
+
+def insight_7():
+    # Insight 7: Rede Social Preferida dos Candidatos por Partido e UF
+    st.subheader("Insight 7: Rede Social Preferida dos Candidatos por Partido e UF")
+    mostrar_grafico("rede_social_uf", "Rede Social Preferida por UF")
+    st.write("Dados:")
+    mostrar_tabela("redes_por_partido_uf.csv")
+
+def insight_8():
+    # Insight 8: Principais Termos nas Propostas de Governo
+    st.subheader("Insight 8: Principais Termos nas Propostas de Governo")
+    mostrar_grafico("nuvem_termos_propostas", "Nuvem de Palavras das Propostas de Governo")
+    st.write("Dados:")
+    mostrar_tabela("termos_propostas.csv")
+
+def insight_9():
+    # Insight 9: Mapeamento do Resultado das Eleições com Folium
+    st.subheader("Insight 9: Mapeamento do Resultado das Eleições com Folium")
+    mapa_path = output_path + "resultado_eleicoes_mapa.html"
+    if mtime(mapa_path) is None:
+        st.warning(f"Arquivo '{mapa_path}' não encontrado. Execute o analise_eleitoral.py.")
+        return
+
+    # O HTML do mapa é grande: só é lido e enviado ao navegador quando o usuário pede
+    if st.toggle("Exibir mapa interativo"):
+        st.components.v1.html(ler_texto(mapa_path, mtime(mapa_path)), height=600, scrolling=True)
+        st.download_button(
+            "Baixar mapa (HTML)", ler_bytes(mapa_path, mtime(mapa_path)),
+            file_name="resultado_eleicoes_mapa.html", mime="text/html"
+        )
+
+    st.write("Este mapa interativo exibe o partido vencedor em cada município, colorido de acordo com a legenda.")
+
+def consulta_interativa():
+    # Filtros e agrupamentos calculados na hora sobre o cubo pré-agregado, sem acessar os CSVs brutos
+    st.subheader("Consulta Interativa de Candidaturas")
+    cubo_path = output_path + "cubo_candidatos.parquet"
+    if mtime(cubo_path) is None:
+        st.warning(f"Arquivo '{cubo_path}' não encontrado. Execute o analise_eleitoral.py --insights 10.")
+        return
+    cubo = ler_parquet(cubo_path, mtime(cubo_path))
+
+    # Cubos gerados antes da dimensão ANO_ELEICAO continuam abrindo
+    dimensoes = {dimensao: rotulo for dimensao, rotulo in DIMENSOES_CUBO.items() if dimensao in cubo.columns}
+    mascara = pd.Series(True, index=cubo.index)
+    colunas = st.columns(3)
+    for i, (dimensao, rotulo) in enumerate(dimensoes.items()):
+        valores = colunas[i % 3].multiselect(rotulo, sorted(cubo[dimensao].dropna().unique()))
+        if valores:
+            mascara &= cubo[dimensao].isin(valores)
+
+    agrupar = st.multiselect(
+        "Agrupar por", list(dimensoes), default=["SG_PARTIDO"], format_func=dimensoes.get
+    )
+    if not agrupar:
+        st.write("Escolha ao menos uma dimensão para agrupar.")
+        return
+
+    resultado = (
+        cubo[mascara]
+        .groupby(agrupar, observed=True)[["NUM_CANDIDATOS", "NUM_COM_BENS", "TOTAL_BENS"]]
+        .sum()
+        .reset_index()
+        .sort_values("NUM_CANDIDATOS", ascending=False)
+    )
+    resultado["MEDIA_BENS"] = (resultado["TOTAL_BENS"] / resultado["NUM_CANDIDATOS"]).round(2)
+    st.dataframe(resultado, hide_index=True)
+    if len(agrupar) == 1:
+        st.bar_chart(resultado.set_index(agrupar[0])["NUM_CANDIDATOS"])
+
+def busca_propostas():
+    # Busca nas Propostas de Governo, respondida pelo índice invertido sem reler os PDFs
+    st.subheader("Busca nas Propostas de Governo")
+    indice_path = output_path + "indice_propostas.sqlite"
+    if not os.path.exists(indice_path):
+        st.write("Gere o índice com `python indice_propostas.py construir` para habilitar a busca.")
+        return
+
+    # Importado aqui para que as outras seções não paguem a importação do pipeline de análise
+    from indice_propostas import buscar
+
+    consulta = st.text_input("Termos ou frases entre aspas (ex.: saneamento \"coleta de lixo\"):", "saneamento")
+    uf_busca = st.text_input("Filtrar por UF (opcional):", "")
+    if consulta:
+        st.dataframe(buscar(consulta, uf=uf_busca or None, caminho=indice_path))
+
+
+SECOES = {
+    "Insight 1: Bens Declarados": insight_1,
+    "Insight 2: Coligações": insight_2,
+    "Insight 3: Maior Partido por UF": insight_3,
+    "Insight 4: Tendência Regional": insight_4,
+    "Insight 5: Partido Dominante": insight_5,
+    "Insight 6: Indígenas e Quilombolas": insight_6,
+    "Insight 7: Redes Sociais": insight_7,
+    "Insight 8: Termos das Propostas": insight_8,
+    "Insight 9: Mapa dos Resultados": insight_9,
+    "Consulta Interativa": consulta_interativa,
+    "Busca nas Propostas": busca_propostas,
+}
+
+secao = st.sidebar.radio("Seção", list(SECOES))
+SECOES[secao]()
 
 st.write("Fonte: Dados das Eleições 2024")
@@ -0,0 +1,234 @@
+import os
+import csv
+import fitz
+import argparse
+import numpy as np
+import pandas as pd
+
+# Gera arquivos com o layout dos dados abertos do TSE (separador ';', latin1, vírgula decimal)
+# numa pasta que imita data/, para medir o pipeline em volumes de SP/MG ou do país inteiro.
+# As linhas de candidatos são reamostradas do arquivo real de exemplo e só as chaves
+# (UF, município, cargo, SQ_CANDIDATO, coligação e situação) são reescritas.
+
+MODELO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "candidatos", "consulta_cand_2024_AC.csv")
+
+# Número de municípios de cada UF com eleição municipal
+MUNICIPIOS_POR_UF = {
+    "AC": 22, "AL": 102, "AM": 62, "AP": 16, "BA": 417, "CE": 184, "ES": 78, "GO": 246, "MA": 217,
+    "MG": 853, "MS": 79, "MT": 141, "PA": 144, "PB": 223, "PE": 184, "PI": 224, "PR": 399, "RJ": 92,
+    "RN": 167, "RO": 52, "RR": 15, "RS": 497, "SC": 295, "SE": 75, "SP": 645, "TO": 139,
+}
+
+# Média de candidaturas por município em 2024 (cerca de 460 mil no país); com escala 1 o
+# volume gerado é próximo do real
+CANDIDATOS_POR_MUNICIPIO = 83
+
+# Código IBGE de cada UF, o mesmo de CODIGOS_IBGE_UF do analise_eleitoral.py. Fica repetido
+# aqui porque importar o pipeline cria output/, baixa as stop words e carrega duckdb e folium
+CODIGOS_UF = {
+    "RO": 11, "AC": 12, "AM": 13, "RR": 14, "PA": 15, "AP": 16, "TO": 17,
+    "MA": 21, "PI": 22, "CE": 23, "RN": 24, "PB": 25, "PE": 26, "AL": 27, "SE": 28, "BA": 29,
+    "MG": 31, "ES": 32, "RJ": 33, "SP": 35, "PR": 41, "SC": 42, "RS": 43,
+    "MS": 50, "MT": 51, "GO": 52, "DF": 53,
+}
+
+CARGOS = {"PREFEITO": 11, "VICE-PREFEITO": 12, "VEREADOR": 13}
+
+COLUNAS_BENS = [
+    "DT_GERACAO", "HH_GERACAO", "ANO_ELEICAO", "CD_TIPO_ELEICAO", "NM_TIPO_ELEICAO", "CD_ELEICAO",
+    "DS_ELEICAO", "DT_ELEICAO", "SG_UF", "SG_UE", "NM_UE", "SQ_CANDIDATO", "NR_ORDEM_BEM_CANDIDATO",
+    "CD_TIPO_BEM_CANDIDATO", "DS_TIPO_BEM_CANDIDATO", "DS_BEM_CANDIDATO", "VR_BEM_CANDIDATO",
+    "DT_ULT_ATUAL_BEM_CANDIDATO", "HH_ULT_ATUAL_BEM_CANDIDATO",
+]
+COLUNAS_COLIGACOES = [
+    "DT_GERACAO", "HH_GERACAO", "ANO_ELEICAO", "CD_TIPO_ELEICAO", "NM_TIPO_ELEICAO", "NR_TURNO",
+    "CD_ELEICAO", "DS_ELEICAO", "DT_ELEICAO", "TP_ABRANGENCIA", "SG_UF", "SG_UE", "NM_UE", "CD_CARGO",
+    "DS_CARGO", "TP_AGREMIACAO", "NR_PARTIDO", "SG_PARTIDO", "NM_PARTIDO", "NR_FEDERACAO",
+    "NM_FEDERACAO", "SG_FEDERACAO", "DS_COMPOSICAO_FEDERACAO", "SQ_COLIGACAO", "NM_COLIGACAO",
+    "DS_COMPOSICAO_COLIGACAO",
+]
+COLUNAS_ELEICAO = ["DT_GERACAO", "HH_GERACAO", "ANO_ELEICAO", "CD_TIPO_ELEICAO", "NM_TIPO_ELEICAO", "CD_ELEICAO", "DS_ELEICAO"]
+
+TIPOS_BEM = [
+    (1, "Prédio residencial"), (11, "Apartamento"), (12, "Casa"), (13, "Terreno"),
+    (21, "Veículo automotor terrestre"), (31, "Depósito bancário em conta corrente"), (99, "Outros bens e direitos"),
+]
+ETNIAS_INDIGENAS = [(1, "Guarani"), (2, "Kaingang"), (3, "Ticuna"), (4, "Yanomami"), (5, "Terena")]
+REDES = ["https://www.instagram.com/", "https://www.facebook.com/", "https://x.com/", "https://twitter.com/",
+         "https://www.youtube.com/@", "https://www.linkedin.com/in/", "https://www.tiktok.com/@", "https://site-"]
+VOCABULARIO_PROPOSTAS = (
+    "saúde educação saneamento segurança mobilidade transporte habitação emprego renda cultura esporte "
+    "lazer turismo agricultura meio ambiente infraestrutura iluminação pavimentação creche escola posto "
+    "hospital coleta de lixo água esgoto programa município gestão transparência participação social "
+    "desenvolvimento econômico inclusão juventude idosos mulheres assistência tecnologia inovação"
+).split()
+
+
+def escrever(df, pasta, nome):
+    os.makedirs(pasta, exist_ok=True)
+    df.to_csv(os.path.join(pasta, nome), sep=";", encoding="latin1", index=False, quoting=csv.QUOTE_ALL, errors="replace")
+
+
+def decimal_virgula(valores):
+    return pd.Series(np.round(valores, 2)).map("{:.2f}".format).str.replace(".", ",", regex=False)
+
+
+def gerar_candidatos(modelo, uf, escala, rng):
+    municipios = MUNICIPIOS_POR_UF[uf]
+    por_municipio = np.maximum(8, rng.poisson(CANDIDATOS_POR_MUNICIPIO * escala, municipios))
+    total = int(por_municipio.sum())
+    municipio = np.repeat(np.arange(municipios), por_municipio)
+    # Posição do candidato dentro do município: 3 chapas de prefeito/vice e o resto vereadores
+    posicao = np.arange(total) - np.repeat(np.cumsum(por_municipio) - por_municipio, por_municipio)
+
+    candidatos = modelo.sample(total, replace=True, random_state=rng).reset_index(drop=True)
+    cargo = np.select([posicao < 3, posicao < 6], ["PREFEITO", "VICE-PREFEITO"], "VEREADOR")
+    candidatos["SG_UF"] = uf
+    candidatos["SG_UF_NASCIMENTO"] = uf
+    candidatos["SG_UE"] = [f"{CODIGOS_UF[uf]:02d}{m:03d}" for m in municipio]
+    candidatos["NM_UE"] = [f"MUNICIPIO {m + 1:03d} {uf}" for m in municipio]
+    candidatos["DS_CARGO"] = cargo
+    candidatos["CD_CARGO"] = pd.Series(cargo).map(CARGOS).astype(str)
+    sq = CODIGOS_UF[uf] * 10**9 + np.arange(1, total + 1)
+    candidatos["SQ_CANDIDATO"] = sq.astype(str)
+    candidatos["NM_CANDIDATO"] = [f"CANDIDATO {s}" for s in sq]
+    candidatos["NM_URNA_CANDIDATO"] = candidatos["NM_CANDIDATO"]
+
+    # Uma coligação por partido em cada município
+    partido = candidatos["NR_PARTIDO"].astype(int).values
+    candidatos["SQ_COLIGACAO"] = (CODIGOS_UF[uf] * 10**9 + municipio * 1000 + partido).astype(str)
+
+    # A primeira chapa de cada município vence; vereadores seguem a distribuição do arquivo modelo
+    situacoes = modelo[modelo["DS_CARGO"] == "VEREADOR"].groupby(["CD_SIT_TOT_TURNO", "DS_SIT_TOT_TURNO"]).size()
+    escolhidas = rng.choice(len(situacoes), total, p=(situacoes / situacoes.sum()).values)
+    cd_situacao = situacoes.index.get_level_values(0).values[escolhidas]
+    ds_situacao = situacoes.index.get_level_values(1).values[escolhidas]
+    eleito = (posicao == 0) | (posicao == 3)
+    majoritario = posicao < 6
+    candidatos["CD_SIT_TOT_TURNO"] = np.where(eleito, "1", np.where(majoritario, "4", cd_situacao))
+    candidatos["DS_SIT_TOT_TURNO"] = np.where(eleito, "ELEITO", np.where(majoritario, "NÃO ELEITO", ds_situacao))
+    return candidatos
+
+
+def gerar_bens(candidatos, rng):
+    quantidade = rng.poisson(2.0, len(candidatos))
+    linhas = np.repeat(np.arange(len(candidatos)), quantidade)
+    bens = candidatos.iloc[linhas][["SG_UF", "SG_UE", "NM_UE", "SQ_CANDIDATO"] + COLUNAS_ELEICAO + ["DT_ELEICAO"]].reset_index(drop=True)
+    tipos = rng.integers(0, len(TIPOS_BEM), len(bens))
+    bens["NR_ORDEM_BEM_CANDIDATO"] = bens.groupby("SQ_CANDIDATO").cumcount() + 1
+    bens["CD_TIPO_BEM_CANDIDATO"] = [TIPOS_BEM[t][0] for t in tipos]
+    bens["DS_TIPO_BEM_CANDIDATO"] = [TIPOS_BEM[t][1] for t in tipos]
+    bens["DS_BEM_CANDIDATO"] = bens["DS_TIPO_BEM_CANDIDATO"].str.upper()
+    bens["VR_BEM_CANDIDATO"] = decimal_virgula(rng.lognormal(11, 1.5, len(bens))).values
+    bens["DT_ULT_ATUAL_BEM_CANDIDATO"] = "15/08/2024"
+    bens["HH_ULT_ATUAL_BEM_CANDIDATO"] = "10:00:00"
+    return bens[COLUNAS_BENS]
+
+
+def gerar_redes_sociais(candidatos, rng):
+    quantidade = rng.poisson(1.2, len(candidatos))
+    linhas = np.repeat(np.arange(len(candidatos)), quantidade)
+    redes = candidatos.iloc[linhas][COLUNAS_ELEICAO + ["SG_UF", "SG_UE", "NM_UE", "SQ_CANDIDATO"]].reset_index(drop=True)
+    redes = redes.rename(columns={"ANO_ELEICAO": "AA_ELEICAO"})
+    redes["NR_ORDEM_REDE_SOCIAL"] = redes.groupby("SQ_CANDIDATO").cumcount() + 1
+    prefixos = np.array(REDES)[rng.integers(0, len(REDES), len(redes))]
+    redes["DS_URL"] = prefixos + "candidato" + redes["SQ_CANDIDATO"]
+    return redes
+
+
+def gerar_info_complementar(candidatos, rng):
+    info = candidatos[COLUNAS_ELEICAO + ["SG_UF", "SQ_CANDIDATO", "CD_COR_RACA", "DS_COR_RACA"]].copy()
+    indigena = rng.random(len(info)) < 0.004
+    etnias = rng.integers(0, len(ETNIAS_INDIGENAS), len(info))
+    info["CD_ETNIA_INDIGENA"] = np.where(indigena, [ETNIAS_INDIGENAS[e][0] for e in etnias], 0)
+    info["DS_ETNIA_INDIGENA"] = np.where(indigena, [ETNIAS_INDIGENAS[e][1] for e in etnias], "NÃO SE APLICA")
+    info["ST_QUILOMBOLA"] = np.where(rng.random(len(info)) < 0.01, "S", "N")
+    info["ST_REELEICAO"] = np.where(rng.random(len(info)) < 0.15, "S", "N")
+    info["ST_DECLARAR_BENS"] = "S"
+    return info
+
+
+def gerar_vagas(candidatos, rng):
+    municipios = candidatos.drop_duplicates("SG_UE")[COLUNAS_ELEICAO + ["DT_ELEICAO", "SG_UF", "SG_UE", "NM_UE"]]
+    vagas = pd.concat(
+        [municipios.assign(CD_CARGO=codigo, DS_CARGO=cargo) for cargo, codigo in CARGOS.items()], ignore_index=True
+    )
+    vagas["QT_VAGAS"] = np.where(vagas["DS_CARGO"] == "VEREADOR", rng.integers(9, 56, len(vagas)), 1)
+    return vagas
+
+
+def gerar_motivo_cassacao(candidatos, rng):
+    cassados = candidatos.sample(max(1, len(candidatos) // 2000), random_state=rng)
+    motivo = cassados[COLUNAS_ELEICAO + ["SG_UF", "SG_UE", "NM_UE", "SQ_CANDIDATO"]].copy()
+    motivo["DS_MOTIVO_CASSACAO"] = rng.choice(["Abuso de poder", "Captação ilícita de sufrágio", "Compra de votos"], len(motivo))
+    return motivo
+
+
+def gerar_municipios(candidatos, rng):
+    # Coordenadas aleatórias dentro do território, só para o mapa do insight 9 ter o que desenhar
+    municipios = candidatos.drop_duplicates("NM_UE")[["NM_UE", "SG_UF"]].rename(columns={"NM_UE": "MUNICIPIO"})
+    municipios["LATITUDE"] = rng.uniform(-33.0, 4.0, len(municipios)).round(4)
+    municipios["LONGITUDE"] = rng.uniform(-73.0, -35.0, len(municipios)).round(4)
+    return municipios
+
+
+def gerar_propostas(candidatos, pasta, quantidade, paginas, rng):
+    prefeitos = candidatos[candidatos["DS_CARGO"] == "PREFEITO"]
+    for sq in prefeitos["SQ_CANDIDATO"].head(quantidade):
+        with fitz.open() as pdf:
+            for _ in range(paginas):
+                palavras = rng.choice(VOCABULARIO_PROPOSTAS, 400)
+                linhas = [" ".join(palavras[i:i + 12]) for i in range(0, len(palavras), 12)]
+                pdf.new_page().insert_text((50, 60), "\n".join(linhas), fontsize=8)
+            pdf.save(os.path.join(pasta, f"proposta_{sq}.pdf"))
+
+
+def gerar(destino, ufs=None, escala=1.0, propostas_por_uf=20, paginas_proposta=2, semente=0, modelo_path=MODELO_PATH):
+    rng = np.random.default_rng(semente)
+    modelo = pd.read_csv(modelo_path, sep=";", encoding="latin1", dtype=str, keep_default_na=False)
+    data = os.path.join(destino, "data")
+    municipios = []
+    for uf in ufs or list(MUNICIPIOS_POR_UF):
+        candidatos = gerar_candidatos(modelo, uf, escala, rng)
+        escrever(candidatos, os.path.join(data, "candidatos"), f"consulta_cand_2024_{uf}.csv")
+        escrever(gerar_bens(candidatos, rng), os.path.join(data, "candidatos_bens"), f"bem_candidato_2024_{uf}.csv")
+        escrever(
+            gerar_info_complementar(candidatos, rng), os.path.join(data, "candidatos_info_complementar"),
+            f"consulta_cand_complementar_2024_{uf}.csv"
+        )
+        escrever(
+            gerar_redes_sociais(candidatos, rng), os.path.join(data, "candidatos_redes_sociais"),
+            f"rede_social_candidato_2024_{uf}.csv"
+        )
+        coligacoes = candidatos[candidatos["DS_CARGO"] == "PREFEITO"].drop_duplicates("SQ_COLIGACAO")[COLUNAS_COLIGACOES]
+        escrever(coligacoes, os.path.join(data, "coligacoes"), f"consulta_coligacao_2024_{uf}.csv")
+        escrever(gerar_vagas(candidatos, rng), os.path.join(data, "vagas"), f"consulta_vagas_2024_{uf}.csv")
+        escrever(gerar_motivo_cassacao(candidatos, rng), os.path.join(data, "motivo_cassacao"), f"motivo_cassacao_2024_{uf}.csv")
+
+        pasta_propostas = os.path.join(data, "candidatos_propostas_governo", uf)
+        os.makedirs(pasta_propostas, exist_ok=True)
+        gerar_propostas(candidatos, pasta_propostas, propostas_por_uf, paginas_proposta, rng)
+        municipios.append(gerar_municipios(candidatos, rng))
+        print(f"{uf}: {len(candidatos)} candidatos")
+
+    os.makedirs(os.path.join(data, "municipios"), exist_ok=True)
+    pd.concat(municipios, ignore_index=True).to_csv(os.path.join(data, "municipios", "municipios.csv"), index=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no layout dos arquivos do TSE")
+    parser.add_argument("destino", help="Pasta onde será criada a estrutura data/")
+    parser.add_argument(
+        "--ufs", type=lambda valor: [uf.strip().upper() for uf in valor.split(",") if uf.strip()], default=None,
+        help="UFs a gerar (ex.: SP,MG). Padrão: todas"
+    )
+    parser.add_argument("--escala", type=float, default=1.0, help="Fator sobre o volume real de candidaturas de 2024")
+    parser.add_argument("--propostas-por-uf", type=int, default=20, help="Número de PDFs de propostas por UF")
+    parser.add_argument("--paginas-proposta", type=int, default=2, help="Páginas de cada PDF de proposta")
+    parser.add_argument("--semente", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    gerar(args.destino, args.ufs, args.escala, args.propostas_por_uf, args.paginas_proposta, args.semente)
@@ -0,0 +1,324 @@
+import os
+import re
+import math
+import sqlite3
+import argparse
+import pandas as pd
+
+from array import array
+from pathlib import Path
+from contextlib import closing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from analise_eleitoral import (
+    DATA_PATHS, PATH_PROPOSTAS, CACHE_PROPOSTAS_DIR, COLUNAS_CANONICAS,
+    stop_words, forma_canonica, sha256_arquivo, texto_proposta, listar_propostas, load_data_from_folder,
+    registrar_rotulos, rotulos_df, exibir
+)
+
+INDICE_PATH = os.path.join("output", "indice_propostas.sqlite")
+
+PADRAO_TOKEN = re.compile(r"[^\W\d_]+")
+PADRAO_SQ_CANDIDATO = re.compile(r"(\d{9,})")
+
+ESQUEMA_INDICE = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    arquivo TEXT UNIQUE NOT NULL,
+    sha256 TEXT NOT NULL,
+    sq_candidato INTEGER,
+    uf TEXT,
+    sg_partido TEXT,
+    num_tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documentos_uf ON documentos (uf);
+CREATE INDEX IF NOT EXISTS documentos_sq_candidato ON documentos (sq_candidato);
+CREATE TABLE IF NOT EXISTS termos (
+    id INTEGER PRIMARY KEY,
+    termo TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    termo_id INTEGER NOT NULL,
+    documento_id INTEGER NOT NULL,
+    frequencia INTEGER NOT NULL,
+    posicoes BLOB NOT NULL,
+    PRIMARY KEY (termo_id, documento_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_documento ON postings (documento_id);
+CREATE TABLE IF NOT EXISTS rotulos (
+    coluna TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    rotulo TEXT NOT NULL,
+    PRIMARY KEY (coluna, chave)
+) WITHOUT ROWID;
+"""
+
+
+def conectar(caminho=INDICE_PATH):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    # WAL permite que o dashboard consulte o índice enquanto ele é atualizado
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.executescript(ESQUEMA_INDICE)
+    return conexao
+
+
+def conectar_leitura(caminho=INDICE_PATH):
+    # Consultas abrem o índice só para leitura, sem o DDL do esquema
+    return sqlite3.connect(Path(caminho).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def tokens_com_posicao(text):
+    # Posições contam todas as palavras, inclusive stop words, para que a busca
+    # por frases respeite a distância original entre os termos
+    return [
+        (posicao, token) for posicao, token in enumerate(PADRAO_TOKEN.findall(text.lower()))
+        if token not in stop_words
+    ]
+
+
+def indexar_documento(file_path, sha256, cache_dir=CACHE_PROPOSTAS_DIR):
+    # Executado nos workers: devolve as posições de cada termo no documento
+    posicoes = defaultdict(list)
+    tokens = tokens_com_posicao(texto_proposta(file_path, cache_dir))
+    for posicao, token in tokens:
+        posicoes[token].append(posicao)
+    return file_path, sha256, dict(posicoes), len(tokens)
+
+
+def sq_candidato_do_arquivo(file_path):
+    encontrado = PADRAO_SQ_CANDIDATO.search(os.path.basename(file_path))
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def partidos_por_candidato():
+    # O índice guarda a forma canônica do partido; a grafia original vai para a tabela de rótulos
+    candidatos = load_data_from_folder(
+        DATA_PATHS["candidatos"], dataset="candidatos", columns=["SQ_CANDIDATO", "SG_PARTIDO"]
+    )
+    if candidatos.empty:
+        return {}, {}
+    return dict(zip(candidatos["SQ_CANDIDATO"], candidatos["SG_PARTIDO"].astype(str))), rotulos_df(candidatos)
+
+
+def gravar_rotulos(conexao, rotulos):
+    conexao.executemany(
+        "INSERT OR REPLACE INTO rotulos (coluna, chave, rotulo) VALUES (?, ?, ?)",
+        [(coluna, chave, rotulo) for coluna, pares in rotulos.items() for chave, rotulo in pares.items()]
+    )
+
+
+def carregar_rotulos(conexao):
+    # Índices criados antes da tabela de rótulos continuam exibindo a forma canônica
+    if conexao.execute("SELECT 1 FROM sqlite_master WHERE name = 'rotulos'").fetchone():
+        for coluna, chave, rotulo in conexao.execute("SELECT coluna, chave, rotulo FROM rotulos"):
+            registrar_rotulos(coluna, [(chave, rotulo)])
+
+
+def remover_documento(conexao, documento_id):
+    conexao.execute("DELETE FROM postings WHERE documento_id = ?", (documento_id,))
+    conexao.execute("DELETE FROM documentos WHERE id = ?", (documento_id,))
+
+
+def construir_indice(ufs=None, caminho=INDICE_PATH, path_propostas=PATH_PROPOSTAS, jobs=None):
+    # Atualização incremental: só PDFs novos ou com conteúdo alterado são indexados
+    conexao = conectar(caminho)
+    arquivos = listar_propostas(ufs, path_propostas)
+    listados = set(arquivos)
+    existentes = {
+        arquivo: (documento_id, sha256)
+        for documento_id, arquivo, sha256 in conexao.execute("SELECT id, arquivo, sha256 FROM documentos")
+    }
+
+    pendentes = []
+    for file_path in arquivos:
+        sha256 = sha256_arquivo(file_path)
+        registro = existentes.get(file_path)
+        if registro is None or registro[1] != sha256:
+            pendentes.append((file_path, sha256))
+
+    # Remove do índice os PDFs que sumiram das UFs atualizadas
+    ufs_atualizadas = {os.path.basename(os.path.dirname(file_path)) for file_path in arquivos}
+    for arquivo, (documento_id, _) in existentes.items():
+        if arquivo not in listados and os.path.basename(os.path.dirname(arquivo)) in ufs_atualizadas:
+            remover_documento(conexao, documento_id)
+
+    if pendentes:
+        partidos, rotulos = partidos_por_candidato()
+        gravar_rotulos(conexao, rotulos)
+        termos = dict(conexao.execute("SELECT termo, id FROM termos"))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            resultados = executor.map(indexar_documento, *zip(*pendentes))
+            for file_path, sha256, posicoes, num_tokens in resultados:
+                if file_path in existentes:
+                    remover_documento(conexao, existentes[file_path][0])
+                sq_candidato = sq_candidato_do_arquivo(file_path)
+                documento_id = conexao.execute(
+                    "INSERT INTO documentos (arquivo, sha256, sq_candidato, uf, sg_partido, num_tokens) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        file_path, sha256, sq_candidato, os.path.basename(os.path.dirname(file_path)),
+                        partidos.get(sq_candidato), num_tokens
+                    )
+                ).lastrowid
+                for termo in posicoes:
+                    if termo not in termos:
+                        termos[termo] = conexao.execute(
+                            "INSERT INTO termos (termo) VALUES (?)", (termo,)
+                        ).lastrowid
+                conexao.executemany(
+                    "INSERT INTO postings (termo_id, documento_id, frequencia, posicoes) VALUES (?, ?, ?, ?)",
+                    [
+                        (termos[termo], documento_id, len(lista), array("I", lista).tobytes())
+                        for termo, lista in posicoes.items()
+                    ]
+                )
+
+    conexao.commit()
+    print(f"Índice atualizado: {len(pendentes)} documentos indexados, {len(arquivos)} PDFs verificados.")
+    return conexao
+
+
+def canonica(valor, coluna):
+    # O índice guarda a forma canônica dos candidatos: "União" e "UNIÃO" viram "UNIAO"
+    return forma_canonica(pd.Series([valor]), COLUNAS_CANONICAS[coluna]).iloc[0]
+
+
+def filtros_documentos(uf=None, partido=None):
+    condicoes, parametros = [], []
+    if uf:
+        condicoes.append("d.uf = ?")
+        parametros.append(canonica(uf, "SG_UF"))
+    if partido:
+        condicoes.append("d.sg_partido = ?")
+        parametros.append(canonica(partido, "SG_PARTIDO"))
+    return "".join(f" AND {condicao}" for condicao in condicoes), parametros
+
+
+def postings_termo(conexao, termo, uf=None, partido=None):
+    filtro, parametros = filtros_documentos(uf, partido)
+    linhas = conexao.execute(
+        "SELECT p.documento_id, p.frequencia, p.posicoes FROM postings p "
+        "JOIN termos t ON t.id = p.termo_id JOIN documentos d ON d.id = p.documento_id "
+        f"WHERE t.termo = ?{filtro}",
+        [termo] + parametros
+    )
+    return {documento_id: (frequencia, posicoes) for documento_id, frequencia, posicoes in linhas}
+
+
+def ocorrencias_frase(conexao, frase, uf=None, partido=None):
+    # Cada termo da frase é buscado com seu deslocamento em relação ao primeiro termo
+    termos = tokens_com_posicao(frase)
+    if not termos:
+        return {}
+    por_termo = [(deslocamento, postings_termo(conexao, termo, uf, partido)) for deslocamento, termo in termos]
+    if len(por_termo) == 1:
+        return {documento_id: frequencia for documento_id, (frequencia, _) in por_termo[0][1].items()}
+
+    documentos = set.intersection(*(set(postings) for _, postings in por_termo))
+    ocorrencias = {}
+    for documento_id in documentos:
+        conjuntos = [
+            (deslocamento, set(array("I", postings[documento_id][1])))
+            for deslocamento, postings in por_termo
+        ]
+        primeiro_deslocamento, inicios = conjuntos[0]
+        total = sum(
+            1 for inicio in inicios
+            if all(inicio - primeiro_deslocamento + deslocamento in posicoes for deslocamento, posicoes in conjuntos[1:])
+        )
+        if total:
+            ocorrencias[documento_id] = total
+    return ocorrencias
+
+
+def separar_consulta(consulta):
+    # Trechos entre aspas são frases; o restante vira termos isolados
+    frases = re.findall(r'"([^"]+)"', consulta)
+    termos = re.sub(r'"[^"]+"', " ", consulta).split()
+    return frases + termos
+
+
+def buscar(consulta, uf=None, partido=None, limite=20, caminho=INDICE_PATH):
+    # Ranqueia os documentos por TF-IDF: soma de (1 + log tf) * log(N / df) de cada termo ou frase
+    colunas = ["SQ_CANDIDATO", "SG_UF", "SG_PARTIDO", "ARQUIVO", "PONTUACAO"]
+    with closing(conectar_leitura(caminho)) as conexao:
+        carregar_rotulos(conexao)
+        total_documentos = conexao.execute("SELECT COUNT(*) FROM documentos").fetchone()[0]
+        pontuacoes = defaultdict(float)
+        for expressao in separar_consulta(consulta):
+            ocorrencias = ocorrencias_frase(conexao, expressao, uf, partido)
+            if not ocorrencias:
+                continue
+            idf = math.log((total_documentos + 1) / len(ocorrencias))
+            for documento_id, frequencia in ocorrencias.items():
+                pontuacoes[documento_id] += (1 + math.log(frequencia)) * idf
+
+        if not pontuacoes:
+            return pd.DataFrame(columns=colunas)
+        melhores = sorted(pontuacoes.items(), key=lambda item: item[1], reverse=True)[:limite]
+        documentos = {
+            documento_id: (sq_candidato, documento_uf, sg_partido, arquivo)
+            for documento_id, sq_candidato, documento_uf, sg_partido, arquivo in conexao.execute(
+                "SELECT id, sq_candidato, uf, sg_partido, arquivo FROM documentos WHERE id IN "
+                f"({','.join('?' * len(melhores))})",
+                [documento_id for documento_id, _ in melhores]
+            )
+        }
+    return exibir(pd.DataFrame(
+        [documentos[documento_id] + (round(pontuacao, 4),) for documento_id, pontuacao in melhores],
+        columns=colunas
+    ))
+
+
+def frequencia_termo(termo, por="uf", uf=None, partido=None, caminho=INDICE_PATH):
+    # Frequência total e número de documentos que citam o termo, por UF ou por partido
+    coluna = {"uf": "uf", "partido": "sg_partido"}[por]
+    filtro, parametros = filtros_documentos(uf, partido)
+    with closing(conectar_leitura(caminho)) as conexao:
+        carregar_rotulos(conexao)
+        return exibir(pd.read_sql_query(
+            f"SELECT d.{coluna} AS {'SG_UF' if por == 'uf' else 'SG_PARTIDO'}, "
+            "SUM(p.frequencia) AS FREQUENCIA, COUNT(*) AS NUM_DOCUMENTOS "
+            "FROM postings p JOIN termos t ON t.id = p.termo_id JOIN documentos d ON d.id = p.documento_id "
+            f"WHERE t.termo = ?{filtro} GROUP BY d.{coluna} ORDER BY FREQUENCIA DESC",
+            conexao, params=[termo.lower()] + parametros
+        ))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Índice invertido das propostas de governo")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    construir = comandos.add_parser("construir", help="Cria ou atualiza o índice")
+    construir.add_argument("--ufs", default=None, help="UFs a indexar, separadas por vírgula. Padrão: todas")
+    construir.add_argument("--jobs", type=int, default=None, help="Número de processos de extração")
+
+    busca = comandos.add_parser("buscar", help="Busca termos ou frases (entre aspas) ranqueando por TF-IDF")
+    busca.add_argument("consulta")
+    busca.add_argument("--uf", default=None)
+    busca.add_argument("--partido", default=None)
+    busca.add_argument("--limite", type=int, default=20)
+
+    frequencia = comandos.add_parser("frequencia", help="Frequência de um termo por UF ou partido")
+    frequencia.add_argument("termo")
+    frequencia.add_argument("--por", choices=["uf", "partido"], default="uf")
+    frequencia.add_argument("--uf", default=None)
+    frequencia.add_argument("--partido", default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.comando == "construir":
+        ufs = [uf.strip().upper() for uf in args.ufs.split(",")] if args.ufs else None
+        construir_indice(ufs, jobs=args.jobs)
+    elif args.comando == "buscar":
+        print(buscar(args.consulta, args.uf, args.partido, args.limite).to_string(index=False))
+    else:
+        print(frequencia_termo(args.termo, args.por, args.uf, args.partido).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
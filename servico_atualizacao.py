@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from fnmatch import fnmatch
+
+# Serviço de atualização: observa as pastas de data/ e, quando o TSE publica arquivos novos
+# ou alterados, espera as gravações terminarem e regera só os insights afetados. A detecção é
+# por varredura periódica (tamanho e mtime), que funciona em qualquer sistema e em pastas de rede.
+# As saídas são publicadas pelo analise_eleitoral.py com escrita em temporário e rename, então o
+# dashboard nunca lê um CSV ou mapa pela metade. O analise_eleitoral.py só é importado dentro das
+# funções, depois do chdir de main(), porque a importação cria output/ na pasta de trabalho.
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALISE_SCRIPT = os.path.join(REPO_DIR, "analise_eleitoral.py")
+INDICE_SCRIPT = os.path.join(REPO_DIR, "indice_propostas.py")
+PASTA_DADOS = "data"
+
+
+def instantaneo(pasta=PASTA_DADOS):
+    # Tamanho e mtime de cada arquivo sob a pasta
+    estado = {}
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in arquivos:
+            caminho = os.path.normpath(os.path.join(raiz, nome))
+            try:
+                stat = os.stat(caminho)
+            except OSError:
+                # Removido durante a varredura
+                continue
+            estado[caminho] = (stat.st_size, stat.st_mtime_ns)
+    return estado
+
+
+def alterados(anterior, atual):
+    # Arquivos novos, modificados ou removidos
+    return sorted(caminho for caminho in anterior.keys() | atual.keys() if anterior.get(caminho) != atual.get(caminho))
+
+
+def padroes_insight(numero):
+    from analise_eleitoral import DATA_PATHS, INSIGHTS
+
+    padroes = [
+        os.path.join(DATA_PATHS[dataset], "**")
+        for dataset in INSIGHTS[numero]["datasets"] if dataset in DATA_PATHS
+    ]
+    padroes += INSIGHTS[numero].get("arquivos", [])
+    return [os.path.normpath(padrao) for padrao in padroes]
+
+
+def insights_afetados(arquivos):
+    # No fnmatch, "*" também casa com "/", então "data/candidatos/**" pega as subpastas de partição
+    from analise_eleitoral import INSIGHTS
+
+    return [
+        numero for numero in INSIGHTS
+        if any(fnmatch(file, padrao) for file in arquivos for padrao in padroes_insight(numero))
+    ]
+
+
+def aguardar_estabilidade(estado, intervalo, debounce):
+    # Junta as mudanças em lote: só segue quando nada mudou por debounce segundos, o que
+    # também evita ler um CSV que ainda está sendo copiado para data/
+    ultima_mudanca = time.monotonic()
+    while time.monotonic() - ultima_mudanca < debounce:
+        time.sleep(min(intervalo, debounce))
+        atual = instantaneo()
+        if atual != estado:
+            estado, ultima_mudanca = atual, time.monotonic()
+    return estado
+
+
+def atualizar(insights, mudancas, jobs=None, argumentos=()):
+    # Cada atualização roda num processo novo: a memória das tabelas carregadas é devolvida ao
+    # fim e um erro no pipeline não derruba o serviço. O manifesto do analise_eleitoral.py
+    # ainda pula os insights cujas entradas não mudaram de conteúdo
+    from analise_eleitoral import PATH_PROPOSTAS
+    from indice_propostas import INDICE_PATH
+
+    if insights:
+        print(f"{len(mudancas)} arquivo(s) alterado(s); atualizando os insights {insights}")
+        comando = [sys.executable, ANALISE_SCRIPT, "--insights", ",".join(str(numero) for numero in insights)]
+        if jobs:
+            comando += ["--jobs", str(jobs), "--jobs-carga", str(jobs)]
+        inicio = time.perf_counter()
+        processo = subprocess.run(comando + list(argumentos))
+        if processo.returncode != 0:
+            print(f"Erro na atualização (código {processo.returncode}); nova tentativa na próxima mudança")
+        else:
+            print(f"Insights {insights} atualizados em {time.perf_counter() - inicio:.1f} s")
+
+    # O índice de busca é incremental: só é mantido se já foi construído
+    padrao_propostas = os.path.normpath(os.path.join(PATH_PROPOSTAS, "*", "*.pdf"))
+    if os.path.exists(INDICE_PATH) and any(fnmatch(file, padrao_propostas) for file in mudancas):
+        print("Atualizando o índice de busca nas propostas")
+        subprocess.run([sys.executable, INDICE_SCRIPT, "construir"])
+
+
+def observar(intervalo=5.0, debounce=30.0, jobs=None, argumentos=(), inicial=True):
+    from analise_eleitoral import INSIGHTS
+
+    estado = instantaneo()
+    if inicial:
+        # Alinha as saídas com os dados atuais; insights sem mudanças são pulados pelo manifesto
+        atualizar(list(INSIGHTS), list(estado), jobs, argumentos)
+    print(f"Observando '{PASTA_DADOS}/' a cada {intervalo:g} s (debounce de {debounce:g} s)")
+    while True:
+        time.sleep(intervalo)
+        atual = instantaneo()
+        if atual == estado:
+            continue
+        # Mudanças feitas durante uma atualização aparecem na varredura seguinte
+        atual = aguardar_estabilidade(atual, intervalo, debounce)
+        mudancas = alterados(estado, atual)
+        estado = atual
+        atualizar(insights_afetados(mudancas), mudancas, jobs, argumentos)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Observa data/ e regera os insights afetados quando os arquivos mudam",
+        epilog="Argumentos depois de -- são repassados ao analise_eleitoral.py (ex.: -- --specs-vega --anos 2024)"
+    )
+    parser.add_argument("--pasta", default=".", help="Pasta que contém data/ e output/")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre duas varreduras de data/")
+    parser.add_argument(
+        "--debounce", type=float, default=30.0,
+        help="Segundos sem mudanças em data/ antes de atualizar; junta as mudanças num único lote"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+        help="Limite de tarefas e de processos de carga de cada atualização. Padrão: metade das CPUs"
+    )
+    parser.add_argument(
+        "--sem-atualizacao-inicial", dest="inicial", action="store_false",
+        help="Não confere as saídas ao iniciar; só reage às mudanças seguintes"
+    )
+    parser.add_argument("argumentos", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    argumentos = args.argumentos[1:] if args.argumentos[:1] == ["--"] else args.argumentos
+    # Os caminhos do analise_eleitoral.py são relativos à pasta de trabalho
+    os.chdir(args.pasta)
+    try:
+        observar(args.intervalo, args.debounce, args.jobs, argumentos, args.inicial)
+    except KeyboardInterrupt:
+        print("Serviço encerrado.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
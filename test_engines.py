@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+import pytest
+
+import analise_eleitoral as ae
+import gerar_dados_sinteticos
+
+# Confere, sobre dados sintéticos numa pasta temporária, se o pandas e o DuckDB geram os
+# mesmos CSVs. Os caminhos do analise_eleitoral.py são relativos à pasta de trabalho
+
+
+@pytest.fixture(scope="module")
+def pasta_dados(tmp_path_factory):
+    destino = tmp_path_factory.mktemp("sintetico")
+    gerar_dados_sinteticos.gerar(str(destino), ["AC", "RR"], escala=0.3, propostas_por_uf=0)
+    return destino
+
+
+@pytest.fixture
+def pasta_trabalho(pasta_dados, monkeypatch):
+    monkeypatch.chdir(pasta_dados)
+    os.makedirs("output", exist_ok=True)
+    return pasta_dados
+
+
+def test_codigos_uf_do_gerador_seguem_o_pipeline():
+    assert gerar_dados_sinteticos.CODIGOS_UF == {uf: codigo for codigo, uf in ae.CODIGOS_IBGE_UF.items()}
+
+
+def saidas_csv(insights):
+    return [saida for numero in insights for saida in ae.INSIGHTS[numero]["saidas"] if saida.endswith(".csv")]
+
+
+def executar(engine):
+    insights = list(ae.CONSULTAS)
+    ae.main(insights, jobs=2, force=True, engine=engine, graficos=False, jobs_carga=2)
+    return {saida: pd.read_csv(saida) for saida in saidas_csv(insights)}
+
+
+def test_engines_geram_os_mesmos_csvs(pasta_trabalho):
+    esperados = executar("pandas")
+    obtidos = executar("duckdb")
+    assert set(esperados) == set(obtidos) == set(saidas_csv(ae.CONSULTAS))
+    for saida, esperado in esperados.items():
+        assert not esperado.empty, saida
+        pd.testing.assert_frame_equal(
+            ae.ordenar_linhas(obtidos[saida]), ae.ordenar_linhas(esperado), check_dtype=False, rtol=1e-9
+        )
+
+
+def test_comparar_engines_mantem_as_saidas(pasta_trabalho):
+    saida = "output/indigenas_por_regiao.csv"
+    with open(saida, "w", encoding="utf-8") as file:
+        file.write("REGIAO,NUM_INDIGENAS\nNorte,1\n")
+    assert ae.comparar_engines(jobs=2, particoes=ae.particoes_execucao())
+    with open(saida, encoding="utf-8") as file:
+        assert file.read() == "REGIAO,NUM_INDIGENAS\nNorte,1\n"
+    assert not [nome for nome in os.listdir("output") if nome.startswith("comparacao_")]